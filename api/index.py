@@ -1,25 +1,36 @@
-import sys
 import os
+import logging
+import importlib.util
 
-# Add the root directory to sys.path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-try:
-    from github_hub.server import app
-    print("Server imported successfully")
-except Exception as e:
-    print(f"Error importing server: {e}")
-    import traceback
-    traceback.print_exc()
-    
-    # Create a minimal Flask app that returns the error
-    from flask import Flask, jsonify
-    app = Flask(__name__)
-    
-    @app.route('/')
-    def error_page():
-        return f"<h1>Import Error</h1><pre>{str(e)}</pre>", 500
-    
-    @app.route('/api/<path:path>')
-    def api_error(path):
-        return jsonify({"error": str(e)}), 500
+logger = logging.getLogger(__name__)
+DEBUG = bool(os.environ.get("DEBUG"))
+
+
+def _fallback_app(message: str):
+    """导入失败时返回错误信息的最小 ASGI 应用"""
+    from fastapi import FastAPI
+    from fastapi.responses import HTMLResponse, JSONResponse
+    fallback = FastAPI()
+
+    @fallback.get('/')
+    async def error_page():
+        return HTMLResponse(f"<h1>Import Error</h1><pre>{message}</pre>", status_code=500)
+
+    @fallback.api_route('/api/{path:path}', methods=['GET', 'POST', 'DELETE'])
+    async def api_error(path: str):
+        return JSONResponse({"error": message}, status_code=500)
+
+    return fallback
+
+
+if importlib.util.find_spec("github_hub") is None:
+    app = _fallback_app("github_hub package not found")
+else:
+    try:
+        from github_hub.server import app
+        if DEBUG:
+            logger.info("Server imported successfully")
+    except Exception as e:
+        # 失败路径不在冷启动热路径上，始终记录
+        logger.exception("Error importing server")
+        app = _fallback_app(str(e))
@@ -0,0 +1,74 @@
+# GitHub Hub - 后台事件循环 (让同步代码调用异步 API)
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """获取常驻后台线程的事件循环 (首次调用时启动)"""
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="github-hub-aio", daemon=True)
+            _loop_thread.start()
+    return _loop
+
+
+def in_loop_thread() -> bool:
+    """当前是否运行在后台事件循环线程中"""
+    return _loop_thread is not None and threading.current_thread() is _loop_thread
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """在后台事件循环中执行协程并阻塞等待结果
+
+    所有异步客户端 (AsyncOpenAI 等) 都绑定在同一个循环上，
+    因此不能用 asyncio.run() 为每次调用新建循环。
+    """
+    loop = get_loop()
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError("run_sync() called from the event loop thread; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+async def run_on_loop(coro: Coroutine) -> Any:
+    """在另一个事件循环 (如 ASGI 服务器的循环) 中等待后台事件循环上执行的协程
+
+    取消等待方时，后台循环上的任务也会被取消。
+    """
+    if in_loop_thread():
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_loop()))
+
+
+async def iter_on_loop(agen: AsyncIterator) -> AsyncIterator:
+    """在另一个事件循环中逐项消费运行在后台事件循环上的异步生成器"""
+    try:
+        while True:
+            try:
+                yield await run_on_loop(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        await run_on_loop(agen.aclose())
+
+
+def iter_sync(agen: AsyncIterator) -> Iterator:
+    """在后台事件循环中逐项消费异步生成器，供同步代码 (如流式响应的同步生成器) 迭代"""
+    async def _next():
+        return await agen.__anext__()
+
+    try:
+        while True:
+            try:
+                yield run_sync(_next())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(agen.aclose())
@@ -1,39 +1,182 @@
 # GitHub Hub - AI 分析 Agent
-from openai import OpenAI
-from typing import Dict, List, Optional
+import asyncio
+import atexit
+import base64
+import contextlib
+import functools
+import httpx
+import openai
+from openai import AsyncOpenAI
+from typing import AsyncIterator, Dict, List, Optional
 import json
-from .config import LM_STUDIO_BASE, LM_STUDIO_KEY, MODELS
+import re
+from collections import Counter
+from .aio import run_sync
+from .llm_cache import cached, project_cache_key
+from .ratelimit import TokenBucket
+from .config import LM_STUDIO_BASE, LM_STUDIO_KEY, MODELS, MODEL_CONCURRENCY, MODEL_RPM, SCAN_CONFIG, LLM_HTTP_CONFIG, CATEGORY_KEYWORDS
 
-class AnalyzerAgent:
-    """AI 分析 Agent - 使用本地 LM Studio 模型"""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 分类请求的最大重试次数 (分类失败会落入默认分类，值得多试几次)
+CLASSIFY_MAX_RETRIES = 3
+
+# AnalyzerAgent / ContentAgent 共享的连接池，避免每个客户端各自建连
+_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=LLM_HTTP_CONFIG["max_connections"],
+        max_keepalive_connections=LLM_HTTP_CONFIG["max_keepalive_connections"],
+    ),
+    timeout=httpx.Timeout(LLM_HTTP_CONFIG["timeout"], connect=LLM_HTTP_CONFIG["connect_timeout"]),
+)
+
+_MODEL_ANALYZER = MODELS["analyzer"]
+_MODEL_CLASSIFIER = MODELS["classifier"]
+_MODEL_VISION = MODELS["vision"]
+
+
+# 每个模型同时在途的生成请求数 (在后台事件循环中懒创建)
+_MODEL_SEMS: Dict[str, asyncio.Semaphore] = {}
+
+# 每个模型的请求速率 (令牌桶，允许短时突发；MODEL_RPM 为 0 的模型不限速)
+_MODEL_BUCKETS: Dict[str, TokenBucket] = {
+    key: TokenBucket(rate=rpm / 60.0, capacity=max(1, min(rpm, MODEL_CONCURRENCY[key] * 2)))
+    for key, rpm in MODEL_RPM.items() if rpm > 0
+}
+
+
+@contextlib.asynccontextmanager
+async def _model_slot(model_key: str):
+    """按模型限流：先按 RPM 取令牌，再占用并发槽位，避免 LM Studio 被压垮或触发托管 API 的配额"""
+    bucket = _MODEL_BUCKETS.get(model_key)
+    if bucket is not None:
+        await bucket.acquire_async()
+    sem = _MODEL_SEMS.get(model_key)
+    if sem is None:
+        sem = _MODEL_SEMS[model_key] = asyncio.Semaphore(MODEL_CONCURRENCY[model_key])
+    async with sem:
+        yield
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client() -> AsyncOpenAI:
+    """进程内唯一的 AsyncOpenAI 客户端，首次使用时创建 (创建失败不缓存，下次重试)"""
+    return AsyncOpenAI(base_url=LM_STUDIO_BASE, api_key=LM_STUDIO_KEY, http_client=_http_client)
+
+
+# 模型常把 JSON 包在 ```json ... ``` 代码块里
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+
+
+def _strip_fence(content: str) -> str:
+    """去掉 Markdown 代码块围栏，没有围栏时原样返回"""
+    m = _FENCE_RE.search(content)
+    return m.group(1) if m else content
+
+
+# 对话追问时同一批搜索结果会反复进入提示词，按字段值缓存格式化结果
+@functools.lru_cache(maxsize=256)
+def _compare_line(name: str, description: str, stars: int) -> str:
+    return f"- {name}: {description} (⭐ {stars})"
+
+
+@functools.lru_cache(maxsize=256)
+def _rag_line(name: str, stars: int, summary: str, topics: tuple) -> str:
+    return f"{name} (⭐ {stars}):\n   Summary: {summary}\n   Tags: {', '.join(topics)}"
+
+
+_IMAGE_CHUNK_SIZE = 48 * 1024
+
+
+def _image_data_url(image_path: str) -> str:
+    """读取图片并编码为 data URL (阻塞操作，应在工作线程中调用)"""
+    buf = bytearray(b"data:image/jpeg;base64,")
+    with open(image_path, "rb") as image_file:
+        # 分块编码，避免原始字节与编码结果同时驻留内存 (块大小为 3 的倍数，块间无填充)
+        while chunk := image_file.read(_IMAGE_CHUNK_SIZE):
+            buf.extend(base64.b64encode(chunk))
+    return buf.decode('ascii')
+
+
+def _build_keyword_matcher():
+    """把所有分类关键词编译成一个匹配器：优先 Aho-Corasick 自动机，否则用单个正则"""
+    keyword_cats: Dict[str, List[str]] = {}
+    for cat_id, keywords in CATEGORY_KEYWORDS.items():
+        for kw in keywords:
+            keyword_cats.setdefault(kw, []).append(cat_id)
     
-    def __init__(self):
-        try:
-            self.client = OpenAI(base_url=LM_STUDIO_BASE, api_key=LM_STUDIO_KEY)
-        except Exception as e:
-            print(f"Warning: Could not initialize OpenAI client: {e}")
-            self.client = None
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for kw, cats in keyword_cats.items():
+            automaton.add_word(kw, (kw, tuple(cats)))
+        automaton.make_automaton()
+        return automaton, None, keyword_cats
     
-    def analyze_project(self, project: Dict, readme: Optional[str] = None) -> Dict:
-        """分析单个项目，生成 Metadata"""
-        
-        context = f"""
-项目名称: {project['name']}
-完整名称: {project['full_name']}
-描述: {project.get('description', '无')}
-语言: {project.get('language', '未知')}
-星标: {project['stars']}
-Topics: {', '.join(project.get('topics', []))}
-"""
-        if readme:
-            context += f"\n\nREADME 内容 (前3000字):\n{readme[:3000]}"
-        
-        prompt = f"""请分析以下 GitHub 开源项目，并以 JSON 格式返回分析结果：
+    alternation = "|".join(re.escape(kw) for kw in sorted(keyword_cats, key=len, reverse=True))
+    return None, re.compile(rf"(?<![a-z0-9])({alternation})(?![a-z0-9])"), keyword_cats
 
-{context}
+
+_KEYWORD_AC, _KEYWORD_RE, _KEYWORD_CATS = _build_keyword_matcher()
+
+
+def classify_by_keywords(text: str) -> List[str]:
+    """按关键词命中次数返回候选分类 (从多到少)，不调用 LLM
+
+    只接受完整单词命中，避免 'rag' 误中 'storage' 这类子串。
+    """
+    text = text.lower()
+    hits = Counter()
+    if _KEYWORD_AC is not None:
+        for end, (kw, cats) in _KEYWORD_AC.iter(text):
+            start = end - len(kw) + 1
+            if (start == 0 or not text[start - 1].isalnum()) and (end + 1 == len(text) or not text[end + 1].isalnum()):
+                hits.update(cats)
+    else:
+        for match in _KEYWORD_RE.finditer(text):
+            hits.update(_KEYWORD_CATS[match.group(1)])
+    return [cat for cat, _ in hits.most_common()]
+
+
+def _keyword_category(project: Dict, categories: List[str]) -> Optional[str]:
+    """关键词快速分类，命中可选分类之一时返回，否则返回 None"""
+    text = " ".join([project.get('name') or '', project.get('description') or '', *project.get('topics', [])])
+    for cat in classify_by_keywords(text):
+        if cat in categories:
+            return cat
+    return None
+
+
+def _fast_loads(content: str):
+    """解析模型返回的 JSON：优先 orjson，解析失败再交给标准库"""
+    if orjson is not None:
+        try:
+            return orjson.loads(content.encode('utf-8', 'surrogatepass'))
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
+
+
+@atexit.register
+def _close_http_client():
+    try:
+        run_sync(_http_client.aclose())
+    except Exception:
+        pass
+
+
+# analyze_project 的静态系统提示词：每次请求前缀相同，LM Studio 可复用 KV 缓存
+_ANALYZE_SYSTEM_PROMPT = """请分析用户提供的 GitHub 开源项目，并以 JSON 格式返回分析结果。
 
 请返回以下 JSON 格式（确保是有效的 JSON）：
-{{
+{
     "summary": "一句话精准概括：这是做什么的+核心技术特点+独特优势。例如：'基于LangChain的多Agent对话系统，支持插件式工具调用和长期记忆'",
     "tech_stack": ["核心技术栈，如 LangChain, FastAPI, ChromaDB 等"],
     "use_cases": ["具体应用场景1", "场景2", "场景3"],
@@ -41,32 +184,93 @@ Topics: {', '.join(project.get('topics', []))}
     "highlights": ["技术亮点1", "亮点2"],
     "ai_tags": ["3-5个最能描述项目功能特点的关键词，如 '多模态', 'RAG检索', '流式对话', '代码生成', '知识库' - 不要用太宽泛的词如 'AI', 'Python'"],
     "quick_start": "快速启动命令"
-}}
+}
 
 只返回 JSON，不要添加其他文字。"""
 
+
+# refine_search_intent 的静态系统提示词 (模块加载时构建一次)
+_REFINE_SYSTEM_PROMPT = """你是一个**严谨的需求分析师**。你的任务是辅助用户精确定义 GitHub 搜索需求。
+
+**核心原则：绝不轻易搜索**。
+绝大多数用户的初始描述都是模糊的（例如 "找个爬虫"）。你的工作是像并在**开始搜索前**，必须收集齐以下 **3 个关键要素**：
+
+1. **核心技术栈 (Tech Stack)**: 必须明确语言（如 Python/Go/Rust）或特定框架（如 React/Next.js）。
+2. **应用场景 (Context)**: 是要一个**开箱即用的工具 (Application)**，还是**开发者库 (Library/SDK)**？或是**学习教程 (Tutorial)**？
+3. **关键特性 (Key Features)**: 具体的差异化需求（例如 "支持分布式"、"带有 Web UI"、"轻量级"）。
+
+---
+**决策流程**:
+
+**情况 A: 信息缺失 (Action: question)**
+如果上述 3 个要素中有**任意一个**不明确：
+- **必须**提出针对性的问题。
+- 一次只问 1-2 个最重要的问题，不要一次性抛出太多。
+- 语气要专业、引导性强。
+
+**情况 B: 信息完备 (Action: search)**
+只有当用户已经明确提供了所有要素，或者用户显式要求 "直接搜" 时：
+- 生成精准的 GitHub Search Query。
+- 必须包含 `language:` 和 `topic:` 过滤器。
+
+---
+**示例**:
+
+**场景 1 (信息极缺)**
+User: "想要个后台管理"
+Assistant: JSON { "action": "question", "content": "后台管理系统有很多种。请问您是偏好 **Java (Spring Boot)**, **Python (Django/FastAPI)** 还是 **Node.js**？另外，您是需要一套**现成的 Admin UI** 还是要一个**后端框架**？", "reasoning": "缺少技术栈和类型" }
+
+**场景 2 (缺少场景)**
+User: "Python 爬虫"
+Assistant: JSON { "action": "question", "content": "收到。请问您是想找一个**开箱即用的爬虫软件**（如直接爬各种网站的工具），还是需要一个**Python 开发库**（如 Scrapy/Playwright）来自己写代码？", "reasoning": "不确定是工具还是库" }
+
+**场景 3 (缺少特性)**
+User: "Python 写的爬虫库，用来爬新闻"
+Assistant: JSON { "action": "question", "content": "了解。针对新闻爬取，您是否需要支持**异步 (Async)**？或者是否需要**自动处理反爬虫 (Anti-detect)** 的功能？", "reasoning": "尝试挖掘高级特性" }
+
+**场景 4 (完备)**
+User: "Python 异步新闻爬虫，支持反爬"
+Assistant: JSON { "action": "search", "content": "news crawler language:python topic:asyncio topic:anti-detect pushed:>2023-01-01", "reasoning": "要素齐备" }
+
+请分析以下对话，返回 JSON:"""
+
+
+class AnalyzerAgent:
+    """AI 分析 Agent - 使用本地 LM Studio 模型"""
+    
+    def __init__(self):
+        try:
+            self.client = _get_client()
+        except Exception as e:
+            print(f"Warning: Could not initialize OpenAI client: {e}")
+            self.client = None
+    
+    def analyze_project(self, project: Dict, readme: Optional[str] = None) -> Dict:
+        """分析单个项目，生成 Metadata"""
+        return run_sync(self.analyze_project_async(project, readme))
+    
+    def analyze_batch(self, projects: List[Dict], readmes: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """并发分析多个项目，结果顺序与 projects 一致"""
+        return run_sync(self.analyze_batch_async(projects, readmes))
+    
+    async def analyze_batch_async(self, projects: List[Dict], readmes: Optional[List[Optional[str]]] = None) -> List[Dict]:
+        """并发分析多个项目 (受 SCAN_CONFIG['analyze_concurrency'] 限制)"""
+        if readmes is None:
+            readmes = [None] * len(projects)
+        sem = asyncio.Semaphore(SCAN_CONFIG["analyze_concurrency"])
+        
+        async def _bounded(project: Dict, readme: Optional[str]) -> Dict:
+            async with sem:
+                return await self.analyze_project_async(project, readme)
+        
+        return await asyncio.gather(*[_bounded(p, r) for p, r in zip(projects, readmes)])
+    
+    async def analyze_project_async(self, project: Dict, readme: Optional[str] = None) -> Dict:
+        """分析单个项目，生成 Metadata (异步)"""
         try:
             if not self.client:
                 return self._default_analysis(project)
-            
-            current_model = MODELS["analyzer"] # Use the high-quality analyzer model
-            response = self.client.chat.completions.create(
-                model=current_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            content = response.choices[0].message.content.strip()
-            # 提取 JSON
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            
-            result = json.loads(content)
-            result['model_name'] = current_model # Include the model name for tracking
-            return result
+            return await self._analyze_project_llm(project, readme)
             
         except json.JSONDecodeError as e:
             print(f"[Analyzer] JSON parse error for {project['name']}: {e}")
@@ -75,11 +279,65 @@ Topics: {', '.join(project.get('topics', []))}
             print(f"[Analyzer] Error analyzing {project['name']}: {e}")
             return self._default_analysis(project)
     
+    @cached(lambda project, readme=None: project_cache_key(project, readme, _MODEL_ANALYZER))
+    async def _analyze_project_llm(self, project: Dict, readme: Optional[str] = None) -> Dict:
+        """调用 LLM 分析项目 (出错时抛出异常，结果写入缓存)"""
+        
+        parts = [
+            f"项目名称: {project['name']}",
+            f"完整名称: {project['full_name']}",
+            f"描述: {project.get('description', '无')}",
+            f"语言: {project.get('language', '未知')}",
+            f"星标: {project['stars']}",
+            f"Topics: {', '.join(project.get('topics', []))}",
+        ]
+        if readme:
+            parts.append(f"\nREADME 内容 (前3000字):\n{readme[:3000]}")
+        context = "\n".join(parts)
+        
+        current_model = _MODEL_ANALYZER # Use the high-quality analyzer model
+        async with _model_slot("analyzer"):
+            response = await self.client.chat.completions.create(
+                model=current_model,
+                messages=[
+                    {"role": "system", "content": _ANALYZE_SYSTEM_PROMPT},
+                    {"role": "user", "content": context},
+                ],
+                temperature=0.3,
+                max_tokens=1000
+            )
+        
+        content = response.choices[0].message.content.strip()
+        # 提取 JSON
+        content = _strip_fence(content)
+        
+        result = _fast_loads(content)
+        result['model_name'] = current_model # Include the model name for tracking
+        return result
+    
     def generate_rag_summary(self, project: Dict, readme: Optional[str] = None) -> str:
         """生成面向 RAG 的高密度总结 (给 LLM 看的)"""
-        context = f"项目: {project['full_name']}\n描述: {project.get('description', '')}\nTopics: {project.get('topics', [])}"
+        return run_sync(self.generate_rag_summary_async(project, readme))
+    
+    async def generate_rag_summary_async(self, project: Dict, readme: Optional[str] = None) -> str:
+        """生成面向 RAG 的高密度总结 (异步)"""
+        try:
+            return await self._rag_summary_llm(project, readme)
+        except Exception as e:
+            print(f"[Analyzer] RAG summary failed: {e}")
+            return project.get('description', '')
+    
+    @cached(lambda project, readme=None: project_cache_key(project, readme, _MODEL_ANALYZER))
+    async def _rag_summary_llm(self, project: Dict, readme: Optional[str] = None) -> str:
+        """调用 LLM 生成 RAG 总结 (出错时抛出异常，结果写入缓存)"""
+        parts = [
+            f"项目: {project['full_name']}",
+            f"描述: {project.get('description', '')}",
+            f"Topics: {project.get('topics', [])}",
+        ]
         if readme:
-            context += f"\nREADME extract: {readme[:2000]}"
+            parts.append(f"README extract: {readme[:2000]}")
+        context = "\n".join(parts)
             
         prompt = f"""请为以下 GitHub 项目生成一段**面向 LLM 的高密度总结** (RAG Summary)。
 目标：当用户提问时，搜索引擎可以通过这段总结快速判断该项目是否符合用户需求。
@@ -96,17 +354,14 @@ Topics: {', '.join(project.get('topics', []))}
 示例格式：
 "[Python] 基于FastAPI的异步Web框架。核心优势是高性能和自动文档生成。适合构建高并发微服务。依赖uvicorn。不支持Python 3.6以下。类似Flask但更快。"
 """
-        try:
-            response = self.client.chat.completions.create(
-                model=MODELS["analyzer"], # Use higher quality model for RAG descriptions
+        async with _model_slot("analyzer"):
+            response = await self.client.chat.completions.create(
+                model=_MODEL_ANALYZER, # Use higher quality model for RAG descriptions
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
                 max_tokens=300
             )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"[Analyzer] RAG summary failed: {e}")
-            return project.get('description', '')
+        return response.choices[0].message.content.strip()
     
     def _default_analysis(self, project: Dict) -> Dict:
         """默认分析结果"""
@@ -120,6 +375,25 @@ Topics: {', '.join(project.get('topics', []))}
     
     def classify_project(self, project: Dict, categories: List[str]) -> str:
         """自动分类项目"""
+        return run_sync(self.classify_project_async(project, categories))
+    
+    async def classify_project_async(self, project: Dict, categories: List[str]) -> str:
+        """自动分类项目 (异步)，关键词明确命中时不调用 LLM"""
+        category = _keyword_category(project, categories)
+        if category:
+            return category
+        if not self.client:
+            return "awesome"
+        try:
+            return await self._classify_llm(project, categories)
+        except (openai.APIError, httpx.HTTPError) as e:
+            # 瞬时错误已由 SDK 重试，这里只处理重试耗尽或不可重试的 API 错误
+            print(f"[Analyzer] Classify failed for {project['name']}: {e}")
+            return "awesome"  # 默认归类到学习资源
+    
+    @cached(lambda project, categories: project_cache_key(project, None, _MODEL_CLASSIFIER, *categories))
+    async def _classify_llm(self, project: Dict, categories: List[str]) -> str:
+        """调用 LLM 分类 (出错时抛出异常，结果写入缓存)"""
         prompt = f"""请判断以下项目最适合哪个分类：
 
 项目: {project['name']}
@@ -131,85 +405,46 @@ Topics: {', '.join(project.get('topics', []))}
 
 只返回一个分类名称，不要其他文字。"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=MODELS["classifier"],
+        # SDK 内置重试：连接错误/超时、408/409/429、5xx，指数退避 + 抖动
+        async with _model_slot("classifier"):
+            response = await self.client.with_options(max_retries=CLASSIFY_MAX_RETRIES).chat.completions.create(
+                model=_MODEL_CLASSIFIER,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
                 max_tokens=50
             )
-            return response.choices[0].message.content.strip()
-        except:
-            return "awesome"  # 默认归类到学习资源
-
+        return response.choices[0].message.content.strip()
+    
     def refine_search_intent(self, history: List[Dict]) -> Dict:
         """根据对话历史优化搜索意图"""
+        return run_sync(self.refine_search_intent_async(history))
+    
+    async def refine_search_intent_async(self, history: List[Dict]) -> Dict:
+        """根据对话历史优化搜索意图 (异步)"""
         
         # 构建对话上下文
-        conversation = ""
-        for msg in history[-5:]: # 取最近5轮
-            role = "User" if msg['role'] == 'user' else "Assistant"
-            conversation += f"{role}: {msg['content']}\n"
-            
-        prompt = f"""你是一个**严谨的需求分析师**。你的任务是辅助用户精确定义 GitHub 搜索需求。
-
-**核心原则：绝不轻易搜索**。
-绝大多数用户的初始描述都是模糊的（例如 "找个爬虫"）。你的工作是像并在**开始搜索前**，必须收集齐以下 **3 个关键要素**：
-
-1. **核心技术栈 (Tech Stack)**: 必须明确语言（如 Python/Go/Rust）或特定框架（如 React/Next.js）。
-2. **应用场景 (Context)**: 是要一个**开箱即用的工具 (Application)**，还是**开发者库 (Library/SDK)**？或是**学习教程 (Tutorial)**？
-3. **关键特性 (Key Features)**: 具体的差异化需求（例如 "支持分布式"、"带有 Web UI"、"轻量级"）。
-
----
-**决策流程**:
-
-**情况 A: 信息缺失 (Action: question)**
-如果上述 3 个要素中有**任意一个**不明确：
-- **必须**提出针对性的问题。
-- 一次只问 1-2 个最重要的问题，不要一次性抛出太多。
-- 语气要专业、引导性强。
-
-**情况 B: 信息完备 (Action: search)**
-只有当用户已经明确提供了所有要素，或者用户显式要求 "直接搜" 时：
-- 生成精准的 GitHub Search Query。
-- 必须包含 `language:` 和 `topic:` 过滤器。
-
----
-**示例**:
-
-**场景 1 (信息极缺)**
-User: "想要个后台管理"
-Assistant: JSON {{ "action": "question", "content": "后台管理系统有很多种。请问您是偏好 **Java (Spring Boot)**, **Python (Django/FastAPI)** 还是 **Node.js**？另外，您是需要一套**现成的 Admin UI** 还是要一个**后端框架**？", "reasoning": "缺少技术栈和类型" }}
-
-**场景 2 (缺少场景)**
-User: "Python 爬虫"
-Assistant: JSON {{ "action": "question", "content": "收到。请问您是想找一个**开箱即用的爬虫软件**（如直接爬各种网站的工具），还是需要一个**Python 开发库**（如 Scrapy/Playwright）来自己写代码？", "reasoning": "不确定是工具还是库" }}
-
-**场景 3 (缺少特性)**
-User: "Python 写的爬虫库，用来爬新闻"
-Assistant: JSON {{ "action": "question", "content": "了解。针对新闻爬取，您是否需要支持**异步 (Async)**？或者是否需要**自动处理反爬虫 (Anti-detect)** 的功能？", "reasoning": "尝试挖掘高级特性" }}
-
-**场景 4 (完备)**
-User: "Python 异步新闻爬虫，支持反爬"
-Assistant: JSON {{ "action": "search", "content": "news crawler language:python topic:asyncio topic:anti-detect pushed:>2023-01-01", "reasoning": "要素齐备" }}
-
-请分析以下对话，返回 JSON:"""
+        conversation = "\n".join(
+            f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
+            for msg in history[-5:] # 取最近5轮
+        )
 
         try:
-            response = self.client.chat.completions.create(
-                model=MODELS["classifier"], # 使用快速模型
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=200
-            )
+            async with _model_slot("classifier"):
+                response = await self.client.chat.completions.create(
+                    model=_MODEL_CLASSIFIER, # 使用快速模型
+                    # 静态指令放在 system 消息，LM Studio 可跨请求复用其 KV 前缀缓存
+                    messages=[
+                        {"role": "system", "content": _REFINE_SYSTEM_PROMPT},
+                        {"role": "user", "content": conversation},
+                    ],
+                    temperature=0.3,
+                    max_tokens=200
+                )
             content = response.choices[0].message.content.strip()
             # Clean JSON
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
+            content = _strip_fence(content)
                 
-            return json.loads(content)
+            return _fast_loads(content)
         except Exception as e:
             print(f"[Analyzer] Refine intent failed: {e}")
             # Fallback to search if error
@@ -218,11 +453,13 @@ Assistant: JSON {{ "action": "search", "content": "news crawler language:python
 
     def analyze_with_vision(self, project: Dict, image_path: str) -> str:
         """使用视觉模型分析截图 (OCR & UI理解)"""
-        import base64
-        
+        return run_sync(self.analyze_with_vision_async(project, image_path))
+    
+    async def analyze_with_vision_async(self, project: Dict, image_path: str) -> str:
+        """使用视觉模型分析截图 (异步)"""
         try:
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
+            # 读文件 + base64 编码放到工作线程，避免阻塞事件循环上的其他请求
+            image_url = await asyncio.to_thread(_image_data_url, image_path)
                 
             prompt = f"""请仔细观察这张 GitHub 项目的截图 (OCR)：
             
@@ -237,24 +474,25 @@ Assistant: JSON {{ "action": "search", "content": "news crawler language:python
 
 请用一段简短的中文总结你的视觉分析结果。"""
 
-            response = self.client.chat.completions.create(
-                model=MODELS["vision"], 
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
+            async with _model_slot("vision"):
+                response = await self.client.chat.completions.create(
+                    model=_MODEL_VISION, 
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": prompt},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": image_url
+                                    }
                                 }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500
-            )
+                            ]
+                        }
+                    ],
+                    max_tokens=500
+                )
             return response.choices[0].message.content
         except Exception as e:
             print(f"[Analyzer] Vision analysis failed: {e}")
@@ -266,7 +504,7 @@ class ContentAgent:
     
     def __init__(self):
         try:
-            self.client = OpenAI(base_url=LM_STUDIO_BASE, api_key=LM_STUDIO_KEY)
+            self.client = _get_client()
         except Exception as e:
             print(f"Warning: Could not initialize ContentAgent OpenAI client: {e}")
             self.client = None
@@ -274,18 +512,55 @@ class ContentAgent:
     
     def generate_tutorial(self, project: Dict, readme: Optional[str] = None, visual_summary: str = "") -> str:
         """生成项目教程 (使用强力模型)"""
-        
-        context = f"""
-项目: {project['full_name']}
-描述: {project.get('description', '')}
-语言: {project.get('language', '')}
-星标: {project['stars']}
-"""
+        return run_sync(self.generate_tutorial_async(project, readme, visual_summary))
+    
+    async def generate_tutorial_async(self, project: Dict, readme: Optional[str] = None, visual_summary: str = "") -> str:
+        """生成项目教程 (异步，汇总流式输出)"""
+        chunks = [chunk async for chunk in self.generate_tutorial_stream(project, readme, visual_summary)]
+        return "".join(chunks)
+    
+    async def generate_tutorial_stream(self, project: Dict, readme: Optional[str] = None,
+                                       visual_summary: str = "") -> AsyncIterator[str]:
+        """流式生成项目教程，逐段产出模型输出"""
+        prompt = self._tutorial_prompt(project, readme, visual_summary)
+        emitted = False
+        try:
+            # 使用强力模型 (Analyzer/80B) 生成高质量教程
+            # 流式生成期间一直占用 analyzer 的并发名额
+            async with _model_slot("analyzer"):
+                response = await self.client.chat.completions.create(
+                    model=_MODEL_ANALYZER, # Switch to Strongest Model
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=3000,
+                    stream=True
+                )
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        emitted = True
+                        yield delta
+        except Exception as e:
+            print(f"[Content] Error generating tutorial for {project['name']}: {e}")
+            if not emitted:
+                yield f"# {project['name']}\n\n{project.get('description', '暂无教程')}"
+    
+    def _tutorial_prompt(self, project: Dict, readme: Optional[str], visual_summary: str) -> str:
+        """构建教程生成提示词"""
+        parts = [
+            f"项目: {project['full_name']}",
+            f"描述: {project.get('description', '')}",
+            f"语言: {project.get('language', '')}",
+            f"星标: {project['stars']}",
+        ]
         if readme:
-            context += f"\nREADME (部分):\n{readme[:4000]}"
+            parts.append(f"README (部分):\n{readme[:4000]}")
             
         if visual_summary:
-            context += f"\n\nUI/界面视觉分析 (OCR):\n{visual_summary}"
+            parts.append(f"\nUI/界面视觉分析 (OCR):\n{visual_summary}")
+        context = "\n".join(parts)
         
         prompt = f"""你是一位资深架构师。目标读者是**有经验的开发者**，请跳过基础概念解释（如"什么是AI Agent"、"什么是RAG"等）。直接分析这个项目的**独特价值和技术实现细节**。
 
@@ -344,27 +619,19 @@ CRITICAL: 直接输出 Markdown 内容，不要有任何开场白（如“当然
 ### 🚀 进阶学习路径
 (学完这个后的下一步是什么？相关项目推荐)
 """
-
-        try:
-            # 使用强力模型 (Analyzer/80B) 生成高质量教程
-            response = self.client.chat.completions.create(
-                model=MODELS["analyzer"], # Switch to Strongest Model
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=3000
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"[Content] Error generating tutorial for {project['name']}: {e}")
-            return f"# {project['name']}\n\n{project.get('description', '暂无教程')}"
+        return prompt
     
     def compare_projects(self, projects: List[Dict]) -> str:
         """对比多个同类项目"""
+        return run_sync(self.compare_projects_async(projects))
+    
+    async def compare_projects_async(self, projects: List[Dict]) -> str:
+        """对比多个同类项目 (异步)"""
         
-        project_list = "\n".join([
-            f"- {p['name']}: {p.get('description', '')} (⭐ {p['stars']})"
+        project_list = "\n".join(
+            _compare_line(p['name'], p.get('description', ''), p['stars'])
             for p in projects[:5]
-        ])
+        )
         
         prompt = f"""请对比以下同类开源项目，分析各自的优缺点和适用场景：
 
@@ -373,12 +640,13 @@ CRITICAL: 直接输出 Markdown 内容，不要有任何开场白（如“当然
 请用表格形式对比，包括：功能特点、性能、易用性、社区活跃度、适合的使用场景。"""
 
         try:
-            response = self.client.chat.completions.create(
-                model=MODELS["analyzer"],
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=2000
-            )
+            async with _model_slot("analyzer"):
+                response = await self.client.chat.completions.create(
+                    model=_MODEL_ANALYZER,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.5,
+                    max_tokens=2000
+                )
             return response.choices[0].message.content
         except Exception as e:
             print(f"[Content] Error comparing projects: {e}")
@@ -386,13 +654,51 @@ CRITICAL: 直接输出 Markdown 内容，不要有任何开场白（如“当然
 
     def recommend_solution(self, query: str, search_results: List[Dict]) -> str:
         """根据搜索结果推荐解决方案"""
+        return run_sync(self.recommend_solution_async(query, search_results))
+    
+    async def recommend_solution_async(self, query: str, search_results: List[Dict]) -> str:
+        """根据搜索结果推荐解决方案 (异步，汇总流式输出)"""
+        chunks = [chunk async for chunk in self.recommend_solution_stream(query, search_results)]
+        return "".join(chunks)
+    
+    async def recommend_solution_stream(self, query: str, search_results: List[Dict]) -> AsyncIterator[str]:
+        """流式生成推荐方案，逐段产出模型输出"""
+        prompt = self._recommend_prompt(query, search_results)
+        emitted = False
+        try:
+            async with _model_slot("analyzer"):
+                response = await self.client.chat.completions.create(
+                    model=_MODEL_ANALYZER, # Use Strong Model
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.5,
+                    max_tokens=1500,
+                    stream=True
+                )
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        emitted = True
+                        yield delta
+        except Exception as e:
+            print(f"[Content] Error recommending solution: {e}")
+            if not emitted:
+                yield "推荐生成失败"
+    
+    def _recommend_prompt(self, query: str, search_results: List[Dict]) -> str:
+        """构建推荐方案提示词"""
         
-        context = "\n".join([
-            f"{i+1}. {p['name']} (⭐ {p['stars']}):\n   Summary: {p.get('ai_rag_summary') or p.get('description', '')}\n   Tags: {', '.join(p.get('topics', [])[:5])}"
+        context = "\n".join(
+            f"{i+1}. " + _rag_line(
+                p['name'], p['stars'],
+                p.get('ai_rag_summary') or p.get('description', ''),
+                tuple(p.get('topics', [])[:5]),
+            )
             for i, p in enumerate(search_results[:8])
-        ])
+        )
         
-        prompt = f"""用户正在寻找解决以下问题的方案：
+        return f"""用户正在寻找解决以下问题的方案：
 "{query}"
 
 基于已有的 GitHub 项目库，我找到了以下相关项目：
@@ -406,15 +712,3 @@ CRITICAL: 直接输出 Markdown 内容，不要有任何开场白（如“当然
 4. **不足之处**：如果没有完美的匹配，目前方案的局限性是什么？
 
 请保持客观、专业，语气亲切。"""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=MODELS["analyzer"], # Use Strong Model
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=1500
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"[Content] Error recommending solution: {e}")
-            return "推荐生成失败"
@@ -8,11 +8,11 @@ from config import SUPABASE_URL, SUPABASE_KEY
 client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 # Total projects
-total_res = client.table("projects").select("id", count="exact").execute()
+total_res = client.table("projects").select("id", count="exact", head=True).execute()
 total = total_res.count
 
 # Analyzed (has ai_summary)
-analyzed_res = client.table("projects").select("id", count="exact").not_.is_("ai_summary", "null").execute()
+analyzed_res = client.table("projects").select("id", count="exact", head=True).not_.is_("ai_summary", "null").execute()
 analyzed = analyzed_res.count
 
 # Pending
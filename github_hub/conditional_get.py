@@ -0,0 +1,63 @@
+# GitHub Hub - 条件请求 (ETag / If-None-Match) 中间件
+import hashlib
+from typing import Iterable
+
+
+def etag_for(body: bytes) -> str:
+    """根据响应内容计算强 ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ConditionalGetMiddleware:
+    """为指定路径的 GET 响应加上 ETag，内容未变化时返回 304 (不再发送响应体)
+
+    只用于返回小块 JSON 的轮询接口：响应体会先完整缓冲再计算哈希，不要用于流式接口。
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = b""
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+                break
+
+        start = None
+        chunks = []
+
+        async def send_with_etag(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            if start["status"] != 200:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            etag = etag_for(body)
+            if etag.encode() in if_none_match:
+                await send({"type": "http.response.start", "status": 304,
+                            "headers": [(b"etag", etag.encode())]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send({**start, "headers": list(start["headers"]) + [(b"etag", etag.encode())]})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
@@ -1,20 +1,191 @@
 # GitHub Hub - GitHub API 爬虫 Agent
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import base64
+import functools
+import hashlib
+import html
+import json
+import multiprocessing
 import random
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from .config import GITHUB_API, GITHUB_TOKEN, CATEGORIES, SCAN_CONFIG
+from .etag_cache import ETagCache
+from .ratelimit import DomainRateLimiter, TokenBucket
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# lxml 解析速度是 html.parser 的数倍，未安装时退回标准库解析器
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
 try:
     from playwright.sync_api import sync_playwright
 except ImportError:
     sync_playwright = None
     print("Warning: Playwright not found. Screenshot features disabled.")
 
+# 匹配 github.com/owner/repo 链接
+_GH_REPO_RE = re.compile(r'github\.com/([a-zA-Z0-9._-]+)/([a-zA-Z0-9._-]+)')
+# 外部网页中的 <a href="...">text</a> (只取 href 与内部文本)
+_ANCHOR_RE = re.compile(r'<a\s[^>]*?href\s*=\s*["\']([^"\']*)["\'][^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+# search_remote 本地质量过滤：排除书籍/教程/合集类仓库 (子串匹配，与原逻辑一致)
+_EXCLUDE_RE = re.compile(r'book|interview|tutorial|course|awesome|collection|list|cheatsheet', re.IGNORECASE)
+# crawl_external_page 中的非项目路径
+_BAD_PATH_RE = re.compile(r'site/policy|login|pricing|features|topics/|search|about|contact', re.IGNORECASE)
+# 网页上的星标数 (如 "1,234" / "12.3k")
+_STARS_RE = re.compile(r'([\d,]+\.?\d*[kK]?)')
+
+def _loads_json(content: bytes):
+    """解析 API 响应体：有 orjson 时直接解析原始字节"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+@functools.lru_cache(maxsize=32)
+def _date_offset(days: int, today: date) -> str:
+    """today 参与缓存键，跨天后自动重新计算"""
+    return (today - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _stable_id(full_name: str) -> str:
+    """无 GitHub 数字 ID 时的占位 ID (跨进程稳定，hash() 受 PYTHONHASHSEED 影响每次启动都不同)"""
+    return hashlib.blake2b(full_name.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def dedupe_across_categories(fetched: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """同一项目常被多个分类的搜索命中；按 fetched 的顺序保留第一次出现，每个项目只写入一次"""
+    seen = set()
+    unique = {}
+    for cat_id, projects in fetched.items():
+        unique[cat_id] = []
+        for project in projects:
+            if project['id'] not in seen:
+                seen.add(project['id'])
+                unique[cat_id].append(project)
+    return unique
+
+
+# 整个进程共享的 GitHub API 令牌桶 (限额按 Token 计算，与 Agent 实例无关)
+# 搜索 API: 认证 30 次/分钟，未认证 10 次/分钟；核心 API: 认证 5000 次/小时，未认证 60 次/小时
+_SEARCH_BUCKET = TokenBucket(rate=(30 if GITHUB_TOKEN else 10) / 60.0, capacity=30 if GITHUB_TOKEN else 10)
+_CORE_BUCKET = TokenBucket(rate=(5000 if GITHUB_TOKEN else 60) / 3600.0, capacity=100 if GITHUB_TOKEN else 60)
+
+# 网页抓取 (新闻源、github.com HTML 备用方案) 按域名限流：同一站点相邻请求至少间隔 1 秒，不同站点可并行
+_HOST_LIMITER = DomainRateLimiter(delay=1.0)
+
+# GraphQL 搜索：只取 _parse_repo 需要的字段，响应体约为 REST 的 1/5
+_GRAPHQL_SEARCH_QUERY = """
+query($q: String!, $first: Int!) {
+  search(query: $q, type: REPOSITORY, first: $first) {
+    nodes {
+      ... on Repository {
+        databaseId name nameWithOwner stargazerCount forkCount description url homepageUrl
+        primaryLanguage { name }
+        repositoryTopics(first: 10) { nodes { topic { name } } }
+        createdAt updatedAt
+      }
+    }
+  }
+}
+"""
+
+# 搜索 API 限流 (403/429) 后的重试策略
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_BASE = 2.0   # 没有限流响应头时的退避基数 (秒)
+RATE_LIMIT_MAX_WAIT = 120.0     # 单次等待上限 (秒)
+
+
+# ============================================================
+# 截图工作进程：每个进程启动并复用一个浏览器
+# ============================================================
+_shot_state = {"playwright": None, "browser": None, "context": None}
+
+
+def _init_screenshot_worker():
+    """截图进程启动时预热浏览器，第一张截图无需等待浏览器启动"""
+    try:
+        _shot_context()
+    except Exception as e:
+        print(f"[Crawler] Screenshot worker could not start browser: {e}")
+
+
+def _shot_context():
+    """当前进程的浏览器上下文 (浏览器断开时重新启动)"""
+    browser = _shot_state["browser"]
+    if browser is not None and not browser.is_connected():
+        _close_shot_browser()
+    if _shot_state["context"] is None:
+        _shot_state["playwright"] = sync_playwright().start()
+        _shot_state["browser"] = _shot_state["playwright"].chromium.launch(headless=True)
+        context = _shot_state["browser"].new_context(viewport={'width': 1280, 'height': 800})
+        # 截图需要图片和字体，只拦截视频/音频
+        context.route(
+            "**/*",
+            lambda route: route.abort() if route.request.resource_type == "media" else route.continue_()
+        )
+        _shot_state["context"] = context
+    return _shot_state["context"]
+
+
+def _close_shot_browser():
+    for key in ("context", "browser"):
+        if _shot_state[key] is not None:
+            try:
+                _shot_state[key].close()
+            except Exception:
+                pass
+    if _shot_state["playwright"] is not None:
+        try:
+            _shot_state["playwright"].stop()
+        except Exception:
+            pass
+    _shot_state.update(playwright=None, browser=None, context=None)
+
+
+def _shot_one(url: str, project_id: str) -> str:
+    """在截图进程中执行：复用浏览器上下文，每个 URL 只新建/关闭一个页面"""
+    page = _shot_context().new_page()
+    try:
+        page.goto(url, timeout=30000)
+        # 等待页面渲染
+        page.wait_for_timeout(2000)
+        
+        # 尝试滚动到 README 区域 (GitHub 的 README 在 article 标签内)
+        try:
+            readme_selector = 'article.markdown-body'
+            if page.locator(readme_selector).count() > 0:
+                page.locator(readme_selector).scroll_into_view_if_needed()
+                page.wait_for_timeout(500)
+        except:
+            # 如果找不到 README，滚动到页面下方一点
+            page.evaluate('window.scrollBy(0, 400)')
+        
+        filename = f"static/screenshots/{project_id}.jpg"
+        page.screenshot(path=filename, quality=80, type='jpeg')
+        return filename
+    finally:
+        page.close()
+
+
 class CrawlerAgent:
     """GitHub 爬虫 Agent - 负责获取项目信息、README 和截图"""
     
@@ -25,9 +196,33 @@ class CrawlerAgent:
         }
         if GITHUB_TOKEN:
             self.headers["Authorization"] = f"token {GITHUB_TOKEN}"
+        
+        # 复用 keep-alive 连接，避免每次请求重新 TCP+TLS 握手
+        self._etag_cache = ETagCache()
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=1,
+                # 429 / 403 限流由各请求的手动重试处理 (等待时间上限 RATE_LIMIT_MAX_WAIT)，
+                # 这里只重试服务端错误，且不按 Retry-After 无上限地等待
+                status_forcelist=[500, 502, 503, 504],
+                respect_retry_after_header=False,
+                raise_on_status=False,  # 重试耗尽后返回最后的响应，由调用方按状态码处理
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
             
         # 确保截图目录存在
         os.makedirs("static/screenshots", exist_ok=True)
+        
+        # 截图在独立进程中执行 (Chromium 的内存与 CPU 不占用主进程)，进程池在首次截图时创建
+        self._screenshot_pool: Optional[ProcessPoolExecutor] = None
+        self._screenshot_lock = threading.Lock()
 
     def capture_screenshot(self, url: str, project_id: str) -> Optional[str]:
         """抓取网页截图 (滚动到 README 区域)"""
@@ -36,31 +231,46 @@ class CrawlerAgent:
              return None
              
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page(viewport={'width': 1280, 'height': 800})
-                page.goto(url, timeout=30000)
-                # 等待页面渲染
-                page.wait_for_timeout(2000)
-                
-                # 尝试滚动到 README 区域 (GitHub 的 README 在 article 标签内)
-                try:
-                    readme_selector = 'article.markdown-body'
-                    if page.locator(readme_selector).count() > 0:
-                        page.locator(readme_selector).scroll_into_view_if_needed()
-                        page.wait_for_timeout(500)
-                except:
-                    # 如果找不到 README，滚动到页面下方一点
-                    page.evaluate('window.scrollBy(0, 400)')
-                
-                filename = f"static/screenshots/{project_id}.jpg"
-                page.screenshot(path=filename, quality=80, type='jpeg')
-                browser.close()
-                return filename
+            return self._get_screenshot_pool().submit(_shot_one, url, project_id).result()
+        except Exception as e:
+            print(f"[Crawler] Screenshot failed for {url}: {e}")
+            return None
+    
+    async def capture_screenshot_async(self, url: str, project_id: str) -> Optional[str]:
+        """capture_screenshot 的协程版本：等待截图进程时不占用线程"""
+        if not sync_playwright:
+             print("[Crawler] Playwright not installed, skipping screenshot.")
+             return None
+        
+        try:
+            return await asyncio.wrap_future(self._get_screenshot_pool().submit(_shot_one, url, project_id))
         except Exception as e:
             print(f"[Crawler] Screenshot failed for {url}: {e}")
             return None
     
+    def _get_screenshot_pool(self) -> ProcessPoolExecutor:
+        """首次截图时启动截图进程池 (每个进程预先启动一个浏览器)"""
+        with self._screenshot_lock:
+            if self._screenshot_pool is None:
+                # 不用 fork：此时进程里已有事件循环、写库、uvicorn 等线程，fork 出的子进程可能继承被占用的锁。
+                # forkserver / spawn 的子进程会以 __mp_main__ 重新执行启动模块，
+                # 因此 server.py / index.py 只在 __name__ != "__mp_main__" 时创建 MasterAgent
+                methods = multiprocessing.get_all_start_methods()
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                self._screenshot_pool = ProcessPoolExecutor(
+                    max_workers=SCAN_CONFIG["screenshot_workers"],
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_init_screenshot_worker,
+                )
+            return self._screenshot_pool
+    
+    def close(self):
+        """关闭截图进程 (进程退出时其浏览器随之关闭)"""
+        with self._screenshot_lock:
+            if self._screenshot_pool is not None:
+                self._screenshot_pool.shutdown(wait=True)
+                self._screenshot_pool = None
+    
     def search_by_keywords(self, keywords: List[str], category: str, 
                            per_page: int = 30) -> List[Dict]:
         """按关键词搜索项目 (优化：合并关键词以减少 API 调用)"""
@@ -69,40 +279,28 @@ class CrawlerAgent:
         # GitHub 限制 Query 长度，如果关键词太多可能需要分批，但一般 5-10 个没问题
         # 格式: (kw1 OR kw2) stars:>100
         
-        joined_keywords = " OR ".join(keywords)
-        query = f"({joined_keywords}) stars:>{SCAN_CONFIG['min_stars']}"
-        
         url = f"{GITHUB_API}/search/repositories"
-        params = {
-            "q": query,
-            "sort": "stars",
-            "order": "desc",
-            "per_page": min(per_page, 100)
-        }
+        params = self._keyword_search_params(keywords, per_page)
         
-        print(f"[Crawler] Searching category '{category}' with query: {query[:50]}...")
+        print(f"[Crawler] Searching category '{category}' with query: {params['q'][:50]}...")
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            # 处理速率限制
-            if response.status_code == 403 or response.status_code == 429:
-                print(f"[Crawler] Rate limit hit for {category}! Waiting 60s...")
-                time.sleep(60)
-                # 重试一次
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                _SEARCH_BUCKET.acquire()
+                response = self.session.get(url, params=params, timeout=30)
+                # 处理速率限制：按 GitHub 返回的重置时间等待后重试
+                if response.status_code not in (403, 429) or attempt == RATE_LIMIT_RETRIES:
+                    break
+                delay = self._rate_limit_delay(response, attempt)
+                print(f"[Crawler] Rate limit hit for {category}! Waiting {delay:.0f}s...")
+                time.sleep(delay)
             
             response.raise_for_status()
-            data = response.json()
+            data = _loads_json(response.content)
             
             projects = []
             for item in data.get("items", []):
                 projects.append(self._parse_repo(item, category))
-                
-            # 搜索 API 限制非常大 (10 req/min for unauth)，所以必须 sleep
-            # 如果有 Token 可以快一点，如果没有建议 sleep 6s
-            delay = 2 if GITHUB_TOKEN else 10
-            time.sleep(delay)
             
             return projects
             
@@ -110,6 +308,76 @@ class CrawlerAgent:
             print(f"[Crawler] Error searching category '{category}': {e}")
             return []
     
+    def _rate_limit_delay(self, response, attempt: int) -> float:
+        """限流后应等待的秒数：优先 Retry-After，其次 X-RateLimit-Reset，都没有时指数退避 + 抖动"""
+        retry_after = response.headers.get("Retry-After", "")
+        reset_at = response.headers.get("X-RateLimit-Reset", "")
+        if retry_after.isdigit():
+            delay = float(retry_after)
+        elif reset_at.isdigit():
+            delay = max(0.0, int(reset_at) - time.time()) + 1  # 多等 1 秒，避免时钟误差
+        else:
+            delay = 2 ** attempt * RATE_LIMIT_BACKOFF_BASE + random.uniform(0, 1)
+        return min(delay, RATE_LIMIT_MAX_WAIT)
+    
+    def search_by_keywords_graphql(self, keywords: List[str], category: str,
+                                   per_page: int = 30) -> List[Dict]:
+        """按关键词搜索项目 (GraphQL，只请求用到的字段；需要 GITHUB_TOKEN)
+        
+        出错时抛出异常，由调用方退回 REST 搜索。
+        """
+        params = self._keyword_search_params(keywords, per_page)
+        variables = {"q": f"{params['q']} sort:stars-desc", "first": params["per_page"]}
+        
+        print(f"[Crawler] GraphQL search for '{category}': {params['q'][:50]}...")
+        _SEARCH_BUCKET.acquire()
+        response = self.session.post(
+            f"{GITHUB_API}/graphql",
+            json={"query": _GRAPHQL_SEARCH_QUERY, "variables": variables},
+            timeout=30,
+        )
+        response.raise_for_status()
+        data = _loads_json(response.content)
+        if data.get("errors"):
+            raise RuntimeError(data["errors"][0].get("message", "GraphQL error"))
+        
+        return [
+            self._parse_graphql_repo(node, category)
+            for node in data["data"]["search"]["nodes"]
+            if node  # 非仓库结果为空对象
+        ]
+    
+    def _parse_graphql_repo(self, node: Dict, category: str) -> Dict:
+        """解析 GraphQL 仓库节点 (字段与 _parse_repo 一致)"""
+        return {
+            "id": str(node["databaseId"]),
+            "name": node["name"],
+            "full_name": node["nameWithOwner"],
+            "category": category,
+            "stars": node["stargazerCount"],
+            "forks": node["forkCount"],
+            "description": node.get("description", ""),
+            "url": node["url"],
+            "homepage": node.get("homepageUrl"),
+            "language": (node.get("primaryLanguage") or {}).get("name"),
+            "topics": [t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]],
+            "created_at": node["createdAt"],
+            "updated_at": node["updatedAt"],
+        }
+    
+    def _keyword_search_params(self, keywords: List[str], per_page: int) -> Dict:
+        """构建关键词搜索参数"""
+        # 将关键词合并为 "keyword1 OR keyword2 ..."
+        # GitHub 限制 Query 长度，如果关键词太多可能需要分批，但一般 5-10 个没问题
+        # 格式: (kw1 OR kw2) stars:>100
+        joined_keywords = " OR ".join(keywords)
+        return {
+            "q": f"({joined_keywords}) stars:>{SCAN_CONFIG['min_stars']}",
+            "sort": "stars",
+            "order": "desc",
+            "per_page": min(per_page, 100)
+        }
+    
     def search_remote(self, query: str, limit: int = 10) -> List[Dict]:
         """实时搜索 GitHub (Raw Project API) with Quality Filter & Pagination"""
         
@@ -128,11 +396,11 @@ class CrawlerAgent:
         print(f"[Crawler] Remote search for: {base_params['q']}...")
         
         projects = []
+        seen_ids = set()
         page = 1
         max_pages = 3 # Safety limit to prevent infinite loops
         
         # Local Quality Filter
-        exclude_keywords = ["book", "interview", "tutorial", "course", "awesome", "collection", "list", "cheatsheet"]
         user_wants_tutorial = any(k in query.lower() for k in ["tutorial", "learn", "course", "book"])
 
         while len(projects) < limit and page <= max_pages:
@@ -140,14 +408,21 @@ class CrawlerAgent:
                 params = base_params.copy()
                 params['page'] = page
                 
-                response = requests.get(f"{GITHUB_API}/search/repositories", headers=self.headers, params=params, timeout=15)
+                for attempt in range(RATE_LIMIT_RETRIES + 1):
+                    _SEARCH_BUCKET.acquire()
+                    response = self.session.get(f"{GITHUB_API}/search/repositories", params=params, timeout=15)
+                    if response.status_code not in (403, 429) or attempt == RATE_LIMIT_RETRIES:
+                        break
+                    delay = self._rate_limit_delay(response, attempt)
+                    print(f"[Crawler] Rate limit hit for Remote Search! Waiting {delay:.0f}s...")
+                    time.sleep(delay)
                 
                 if response.status_code in [403, 429]:
                     print(f"[Crawler] Rate limit hit for Remote Search!")
                     break
                 
                 response.raise_for_status()
-                data = response.json()
+                data = _loads_json(response.content)
                 items = data.get("items", [])
                 
                 if not items:
@@ -159,14 +434,14 @@ class CrawlerAgent:
                         
                     # Filter 1: Exclude Spam/Books
                     if not user_wants_tutorial:
-                        desc = (item.get("description") or "").lower()
-                        name = item["name"].lower()
-                        if any(bad in name or bad in desc for bad in exclude_keywords):
+                        if _EXCLUDE_RE.search(item["name"]) or _EXCLUDE_RE.search(item.get("description") or ""):
                             continue
                     
                     # Deduplication (Check if we already added this ID in this session)
-                    if any(p['id'] == str(item['id']) for p in projects):
+                    item_id = str(item['id'])
+                    if item_id in seen_ids:
                         continue
+                    seen_ids.add(item_id)
 
                     p = self._parse_repo(item, "remote_search")
                     if not p.get('ai_rag_summary'):
@@ -174,7 +449,6 @@ class CrawlerAgent:
                     projects.append(p)
                 
                 page += 1
-                time.sleep(1) # Be nice to API
                 
             except Exception as e:
                 print(f"[Crawler] Error remote searching page {page}: {e}")
@@ -194,9 +468,10 @@ class CrawlerAgent:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            _SEARCH_BUCKET.acquire()
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = _loads_json(response.content)
             return [self._parse_repo(item, "trending") for item in data.get("items", [])]
         except Exception as e:
             print(f"[Crawler] Error fetching trending: {e}")
@@ -213,9 +488,10 @@ class CrawlerAgent:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
+            _SEARCH_BUCKET.acquire()
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = _loads_json(response.content)
             return [self._parse_repo(item, "new_releases") for item in data.get("items", [])]
         except Exception as e:
             print(f"[Crawler] Error fetching new releases: {e}")
@@ -225,17 +501,41 @@ class CrawlerAgent:
         """获取项目 README 内容"""
         url = f"{GITHUB_API}/repos/{full_name}/readme"
         
+        def _decode(data: Dict) -> str:
+            # README 内容是 base64 编码的
+            content = base64.b64decode(data.get("content", "")).decode("utf-8")
+            return content[:10000]  # 限制长度
+        
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                # README 内容是 base64 编码的
-                import base64
-                content = base64.b64decode(data.get("content", "")).decode("utf-8")
-                return content[:10000]  # 限制长度
+            return self._get_json_cached(url, f"gh:readme:{full_name}", timeout=15, parse=_decode)
         except:
             pass
         return None
+    
+    def _get_json_cached(self, url: str, cache_key: str, timeout: int, parse=None):
+        """带 ETag 缓存的 GET
+        
+        新鲜期内直接返回缓存；之后发送 If-None-Match 条件请求，
+        304 (不计入主速率限制) 时沿用缓存。parse 在写入缓存前处理 JSON。
+        非 2xx/304 响应照常抛出 HTTPError。
+        """
+        cached = self._etag_cache.get(cache_key)
+        if cached and ETagCache.is_fresh(cached):
+            return cached[1]
+        
+        headers = {"If-None-Match": cached[0]} if cached and cached[0] else None
+        _CORE_BUCKET.acquire()
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            self._etag_cache.set(cache_key, cached[0], cached[1])  # 刷新有效期
+            return cached[1]
+        
+        response.raise_for_status()
+        data = _loads_json(response.content)
+        if parse:
+            data = parse(data)
+        self._etag_cache.set(cache_key, response.headers.get("ETag"), data)
+        return data
 
     def fetch_project_by_url(self, url: str) -> Optional[Dict]:
         """通过 URL 获取项目详情"""
@@ -249,10 +549,7 @@ class CrawlerAgent:
             repo_full_name = f"{parts[-2]}/{parts[-1]}"
             
             api_url = f"{GITHUB_API}/repos/{repo_full_name}"
-            response = requests.get(api_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json_cached(api_url, f"gh:repo:{repo_full_name}", timeout=10)
             return self._parse_repo(data, "manual") # 'manual' category
             
         except Exception as e:
@@ -267,10 +564,11 @@ class CrawlerAgent:
     def _scrape_github_page_fallback(self, url: str) -> Optional[Dict]:
         """Github API 限流时的备用方案：直接爬取网页"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            _HOST_LIMITER.wait(urlparse(url).netloc)
+            response = self.session.get(url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, _HTML_PARSER)
             
             # Extract basic info from Meta Tags
             og_title = soup.find("meta", property="og:title")
@@ -281,8 +579,7 @@ class CrawlerAgent:
             
             # Helper to find number in text
             def parse_stars(text):
-                import re
-                match = re.search(r'([\d,]+\.?\d*[kK]?)', text)
+                match = _STARS_RE.search(text)
                 if not match: return 0
                 val = match.group(1).replace(',', '')
                 if 'k' in val.lower():
@@ -298,7 +595,7 @@ class CrawlerAgent:
                 stars = parse_stars(star_span.get_text())
                 
             return {
-                "id": str(hash(full_name)), # Mock ID
+                "id": _stable_id(full_name), # Mock ID
                 "name": full_name.split('/')[-1],
                 "full_name": full_name,
                 "description": description,
@@ -335,29 +632,35 @@ class CrawlerAgent:
     
     def _get_date_offset(self, days: int) -> str:
         """获取 N 天前的日期"""
-        from datetime import datetime, timedelta
-        date = datetime.now() - timedelta(days=days)
-        return date.strftime("%Y-%m-%d")
+        return _date_offset(days, date.today())
+    
+    def scan_category(self, cat_id: str, cat_config: Dict) -> List[Dict]:
+        """抓取单个分类 (线程安全，可在线程池中并发调用)"""
+        if cat_id == "trending":
+            return self.get_trending()
+        if cat_id == "new_releases":
+            return self.get_new_releases()
+        if GITHUB_TOKEN:
+            try:
+                return self.search_by_keywords_graphql(cat_config["keywords"], cat_id)
+            except Exception as e:
+                print(f"[Crawler] GraphQL search failed for '{cat_id}', falling back to REST: {e}")
+        return self.search_by_keywords(cat_config["keywords"], cat_id)
     
     def crawl_all_categories(self, db) -> Dict:
-        """爬取所有分类"""
+        """爬取所有分类 (线程池并发抓取，GitHub 请求频率由令牌桶控制；抓取完成后在当前线程写库)"""
         results = {}
+        with ThreadPoolExecutor(max_workers=SCAN_CONFIG["crawl_concurrency"]) as pool:
+            futures = {cat_id: pool.submit(self.scan_category, cat_id, cat_config)
+                       for cat_id, cat_config in CATEGORIES.items()}
+        fetched = dedupe_across_categories({cat_id: future.result() for cat_id, future in futures.items()})
         
-        for cat_id, cat_config in CATEGORIES.items():
-            print(f"[Crawler] Scanning category: {cat_config['name']}")
-            
-            if cat_id == "trending":
-                projects = self.get_trending()
-            elif cat_id == "new_releases":
-                projects = self.get_new_releases()
-            else:
-                projects = self.search_by_keywords(cat_config["keywords"], cat_id)
-            
-            # 存入数据库
-            new_count = 0
-            for project in projects:
-                db.upsert_project(project)
-                new_count += 1
+        # 存入数据库 (所有分类一次批量写入)
+        db.upsert_projects([p for projects in fetched.values() for p in projects])
+        
+        for cat_id, projects in fetched.items():
+            cat_config = CATEGORIES[cat_id]
+            new_count = len(projects)
             
             db.log_scan(cat_id, len(projects), new_count, "success")
             results[cat_id] = len(projects)
@@ -370,38 +673,32 @@ class CrawlerAgent:
         print(f"[Crawler] Scanning external source: {url}")
         projects = []
         try:
-            # 简单请求网页
-            response = requests.get(url, headers=self.headers, timeout=15)
+            # 简单请求网页 (外部站点，不携带 GitHub Token)
+            _HOST_LIMITER.wait(urlparse(url).netloc)
+            response = self.session.get(url, headers={"Authorization": None}, timeout=15)
             if response.status_code != 200:
                 print(f"[Crawler] Failed to load {url}: {response.status_code}")
                 return []
                 
-            # 解析 HTML，提取所有 github.com/user/repo 格式链接
-            from bs4 import BeautifulSoup
-            import re
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # 查找所有 a 标签
-            links = soup.find_all('a', href=True)
-            
+            # 只需要 <a href> 和链接文本，直接在 HTML 上逐个匹配，不构建 DOM
             seen_repos = set()
             
-            for link in links:
-                href = link['href']
+            for link in _ANCHOR_RE.finditer(response.text):
+                href = link.group(1)
                 # 匹配 github.com/owner/repo (且不包含 issues, pulls 等)
                 # 优化正则：排除 common false positives
-                match = re.search(r'github\.com/([a-zA-Z0-9._-]+)/([a-zA-Z0-9._-]+)', href)
+                match = _GH_REPO_RE.search(href)
                 if match:
                     full_name = f"{match.group(1)}/{match.group(2)}"
                     
                     # 过滤: 排除自己, 排除常见非项目路径
                     if full_name in seen_repos: continue
-                    if any(x in full_name.lower() for x in ['site/policy', 'login', 'pricing', 'features', 'topics/', 'search', 'about', 'contact']): continue
+                    if _BAD_PATH_RE.search(full_name): continue
                     
                     seen_repos.add(full_name)
                     
                     # 获取链接文本作为简单描述
-                    link_text = link.get_text().strip()
+                    link_text = html.unescape(_TAG_RE.sub('', link.group(2))).strip()
                     if not link_text or "github.com" in link_text:
                         # 尝试获取父级上下文? 暂时先留空
                         link_text = "Discovered via link"
@@ -410,7 +707,7 @@ class CrawlerAgent:
                     
                     # Lightweight Item
                     projects.append({
-                        "id": str(hash(full_name)),
+                        "id": _stable_id(full_name),
                         "name": full_name.split('/')[-1],
                         "full_name": full_name,
                         "description": f"Found in {url}. Link text: {link_text[:50]}...",
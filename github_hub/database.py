@@ -1,38 +1,219 @@
 # GitHub Hub - Database Layer (Supabase PostgreSQL)
+import atexit
+import functools
 import json
+import logging
+import queue
 import threading
-from datetime import datetime
-from typing import Optional, List, Dict
-from supabase import create_client, Client
-from .config import SUPABASE_URL, SUPABASE_KEY
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Iterator
+import httpx
+try:
+    import orjson
+except ImportError:
+    orjson = None
+# httpx needs the h2 package for HTTP/2
+try:
+    import h2  # noqa: F401
+except ImportError:
+    h2 = None
+try:
+    import redis
+except ImportError:
+    redis = None
+from supabase import create_client, Client, ClientOptions
+from .config import SUPABASE_URL, SUPABASE_KEY, SUPABASE_HTTP_CONFIG, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Background writes: coalesce per-project updates and flush every WRITE_FLUSH_INTERVAL seconds
+# or once WRITE_BATCH_SIZE updates are queued
+WRITE_FLUSH_INTERVAL = 0.5
+WRITE_BATCH_SIZE = 100
+# A failed update is requeued up to WRITE_MAX_RETRIES times, waiting WRITE_RETRY_DELAY * attempt
+# seconds before each retry, then dropped and reported by flush()
+WRITE_MAX_RETRIES = 3
+WRITE_RETRY_DELAY = 1.0
+
+# Redis set mirroring every stored project id (only when REDIS_URL is configured); rebuilt daily
+# from the table so writes made outside this class (migrations, SQL console) are picked up
+PROJECT_IDS_KEY = "github_hub:project_ids"
+PROJECT_IDS_TTL = 24 * 3600
+
+# Columns the analysis pipeline reads (skips large ai_tutorial / readme_content payloads)
+ANALYSIS_COLUMNS = (
+    "id,name,full_name,category,description,url,homepage,language,stars,topics,updated_at,"
+    "ai_summary,ai_model_name,ai_rag_summary,screenshot"
+)
+
+# Columns list views render; has_tutorial is a computed column (see supabase_schema.sql)
+# so the multi-KB ai_tutorial markdown is not shipped just to show a badge
+DEFAULT_LIST_COLS = (
+    "id,name,full_name,category,stars,forks,description,url,language,topics,"
+    "ai_summary,ai_model_name,has_tutorial"
+)
+
+# Rows per bulk upsert request (keeps payloads well under PostgREST's request size limit)
+UPSERT_CHUNK_SIZE = 500
+
+# Dashboard aggregates are polled often and change slowly
+STATS_TTL = 30
+
+# Tutorials are large and only change when regenerated (writes update the cache directly)
+TUTORIAL_TTL = 300
+TUTORIAL_CACHE_SIZE = 1024
+
+
+class _TTLCache:
+    """Per-process TTL cache grouped by name so writes can invalidate a whole group"""
+    
+    def __init__(self):
+        self._groups: Dict[str, Dict[tuple, tuple]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, group: str, key: tuple):
+        with self._lock:
+            entry = self._groups.get(group, {}).get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0], True
+        return None, False
+    
+    def set(self, group: str, key: tuple, value, ttl: float, maxsize: Optional[int] = None):
+        with self._lock:
+            entries = self._groups.setdefault(group, {})
+            entries.pop(key, None)
+            entries[key] = (value, time.monotonic() + ttl)
+            if maxsize is not None and len(entries) > maxsize:
+                # Oldest write first (dicts keep insertion order)
+                del entries[next(iter(entries))]
+    
+    def invalidate(self, *groups: str):
+        with self._lock:
+            for group in groups:
+                self._groups.pop(group, None)
+
+
+def ttl_cached(group: str, ttl_seconds: float = STATS_TTL):
+    """Cache a Database method's result in self._cache for ttl_seconds"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            value, hit = self._cache.get(group, key)
+            if hit:
+                return value
+            value = func(self, *args, **kwargs)
+            self._cache.set(group, key, value, ttl_seconds)
+            return value
+        return wrapper
+    return decorator
+
 
 class Database:
     """Database layer using Supabase PostgreSQL"""
     
     def __init__(self, db_path: str = None):
         """Initialize Supabase client. db_path is ignored (legacy compat)."""
-        self.lock = threading.RLock()  # Keep for thread safety
+        self._cache = _TTLCache()
+        self._http = self._http_client()
+        self._redis = None
+        if redis and REDIS_URL:
+            try:
+                self._redis = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+            except Exception as e:
+                print(f"Warning: Could not connect to Redis at {REDIS_URL}: {e}")
         try:
-            self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+            options = self._client_options(self._http)
+            if options is not None:
+                self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+            else:
+                self.supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
             print(f"Connected to Supabase: {SUPABASE_URL}")
         except Exception as e:
             print(f"Error connecting to Supabase: {e}")
             self.supabase = None
+        
+        # update_project_* calls are queued and written by a background thread
+        self._write_queue: "queue.Queue" = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._failed_writes: List[str] = []
+        self.write_failures = 0
+        self._writer = threading.Thread(target=self._write_worker, name="github-hub-db-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+    
+    @staticmethod
+    def _http_client() -> httpx.Client:
+        """Bounded, keep-alive HTTP pool shared by PostgREST and the raw list reads
+        
+        httpx.Client is thread-safe, so request handlers, the writer thread and background jobs
+        all reuse these connections. With h2 installed, concurrent requests multiplex over HTTP/2.
+        """
+        limits = httpx.Limits(
+            max_connections=SUPABASE_HTTP_CONFIG["max_connections"],
+            max_keepalive_connections=SUPABASE_HTTP_CONFIG["max_keepalive_connections"],
+            keepalive_expiry=SUPABASE_HTTP_CONFIG["keepalive_expiry"],
+        )
+        return httpx.Client(limits=limits, http2=h2 is not None)
+    
+    @staticmethod
+    def _client_options(http_client: httpx.Client) -> Optional[ClientOptions]:
+        """Client options using our pool (None on supabase versions without httpx_client)"""
+        try:
+            return ClientOptions(httpx_client=http_client)
+        except TypeError:
+            return None
+    
+    def _rest_select(self, table: str, params: dict) -> List[Dict]:
+        """GET rows straight from PostgREST and decode the raw body with orjson
+        
+        Used for bulk reads where JSON decoding dominates; same auth headers as supabase-py.
+        """
+        response = self._http.get(
+            f"{SUPABASE_URL}/rest/v1/{table}",
+            params=params,
+            headers={"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"},
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     def _ensure_client(self):
         """Check if Supabase client is available"""
         if not self.supabase:
             raise Exception("Supabase client not initialized")
     
+    def close(self):
+        """Write out queued updates and release the HTTP pool"""
+        self.flush()
+        self._http.close()
+    
     # ========== Projects ==========
     
     def upsert_project(self, project: dict):
         """Insert or update a project"""
+        self.upsert_projects([project])
+    
+    def upsert_projects(self, projects: List[dict], chunk_size: int = UPSERT_CHUNK_SIZE):
+        """Insert or update many projects, one request per chunk_size rows"""
+        if not projects:
+            return
         self._ensure_client()
-        now = datetime.now().isoformat()
+        # One timestamp per batch: every row from this scan shares last_scanned
+        now = datetime.now(timezone.utc).isoformat()
         
-        # Prepare data for PostgreSQL
-        data = {
+        # Same id twice in one upsert makes PostgreSQL reject the whole batch; keep the last one
+        rows = list({str(p['id']): self._project_row(p, now) for p in projects}.values())
+        
+        for start in range(0, len(rows), chunk_size):
+            self.supabase.table("projects").upsert(rows[start:start + chunk_size], on_conflict="id").execute()
+        self._cache.invalidate("stats", "dashboard", "pending", "categories")
+        self._update_id_set(add=[row["id"] for row in rows])
+    
+    def _project_row(self, project: dict, now: str) -> dict:
+        """Prepare a project row for PostgreSQL"""
+        return {
             "id": str(project['id']),
             "name": project['name'],
             "full_name": project['full_name'],
@@ -48,40 +229,173 @@ class Database:
             "updated_at": project.get('updated_at'),
             "last_scanned": now,
         }
+    
+    def get_all_projects(self, columns: str = DEFAULT_LIST_COLS) -> List[Dict]:
+        """Get all projects (loads the whole table; prefer iter_all_projects for large scans)
         
-        with self.lock:
-            self.supabase.table("projects").upsert(data).execute()
+        Pass columns="*" for full rows, e.g. for export.
+        """
+        return list(self.iter_all_projects(columns=columns))
     
-    def get_all_projects(self) -> List[Dict]:
-        """Get all projects"""
+    def iter_all_projects(self, page_size: int = 500, columns: str = DEFAULT_LIST_COLS,
+                          category: Optional[str] = None) -> Iterator[Dict]:
+        """Yield all projects (optionally one category) page by page using keyset pagination on id
+        
+        Each page is "id > last id seen", so page cost stays flat however deep the scan goes
+        (OFFSET re-scans all skipped rows) and rows inserted mid-scan don't shift pages.
+        """
         self._ensure_client()
-        response = self.supabase.table("projects").select("*").execute()
-        return [dict(row) for row in response.data]
+        if columns != "*" and "id" not in columns.split(","):
+            columns = "id," + columns
+        last_id = None
+        while True:
+            if orjson is not None:
+                params = {"select": columns, "order": "id.asc", "limit": page_size}
+                if category is not None:
+                    params["category"] = f"eq.{category}"
+                if last_id is not None:
+                    params["id"] = f"gt.{last_id}"
+                rows = self._rest_select("projects", params)
+            else:
+                query = self.supabase.table("projects").select(columns)
+                if category is not None:
+                    query = query.eq("category", category)
+                if last_id is not None:
+                    query = query.gt("id", last_id)
+                rows = query.order("id").limit(page_size).execute().data
+            yield from rows
+            if len(rows) < page_size:
+                break
+            last_id = rows[-1]["id"]
+    
+    def iter_projects_by_category(self, category: str, page_size: int = 500,
+                                  columns: str = "*") -> Iterator[Dict]:
+        """Yield every project in a category, page_size rows per request (full rows by default)"""
+        return self.iter_all_projects(page_size=page_size, columns=columns, category=category)
     
-    def get_projects_by_category(self, category: str, limit: int = 100) -> List[Dict]:
+    def get_projects_by_category(self, category: str, limit: int = 100,
+                                 columns: str = DEFAULT_LIST_COLS) -> List[Dict]:
         """Get projects by category"""
         self._ensure_client()
-        response = self.supabase.table("projects").select("*").eq("category", category).limit(limit).execute()
-        return [dict(row) for row in response.data]
+        try:
+            response = self.supabase.table("projects").select(columns).eq("category", category)\
+                .order("stars", desc=True).limit(limit).execute()
+        except Exception as e:
+            if columns == "*":
+                raise
+            # has_tutorial is missing until the schema migration has been applied
+            print(f"Column projection failed, fetching full rows: {e}")
+            response = self.supabase.table("projects").select("*").eq("category", category)\
+                .order("stars", desc=True).limit(limit).execute()
+        return response.data or []
     
     def get_project(self, project_id: str) -> Optional[Dict]:
         """Get single project by ID"""
         self._ensure_client()
-        response = self.supabase.table("projects").select("*").eq("id", str(project_id)).execute()
-        if response.data:
-            return dict(response.data[0])
+        # maybe_single() asks PostgREST for one object; some client versions return None when no row matches
+        response = self.supabase.table("projects").select("*").eq("id", str(project_id)).maybe_single().execute()
+        if response and response.data:
+            return response.data
         return None
     
+    def get_by_ids(self, project_ids: List[str], columns: str = ANALYSIS_COLUMNS) -> List[Dict]:
+        """Fetch several projects in one id=in.(...) query, only the given columns"""
+        ids = [str(pid) for pid in project_ids]
+        if not ids:
+            return []
+        self._ensure_client()
+        response = self.supabase.table("projects").select(columns).in_("id", ids).execute()
+        return response.data or []
+    
+    def existing_ids(self, project_ids: List[str], chunk_size: int = 200) -> set:
+        """Return which of project_ids are already stored
+        
+        Answered from the Redis id set when available, otherwise one id=in.(...) query per chunk.
+        """
+        ids = list(dict.fromkeys(str(pid) for pid in project_ids))
+        if not ids:
+            return set()
+        if self._load_id_set():
+            try:
+                return {pid for pid, hit in zip(ids, self._redis.smismember(PROJECT_IDS_KEY, ids)) if hit}
+            except Exception as e:
+                print(f"[Database] Redis id lookup failed, querying Supabase: {e}")
+        self._ensure_client()
+        found = set()
+        # Chunked so the id list stays well inside URL length limits
+        for start in range(0, len(ids), chunk_size):
+            response = self.supabase.table("projects").select("id").in_("id", ids[start:start + chunk_size]).execute()
+            found.update(row['id'] for row in response.data)
+        return found
+    
     def delete_project(self, project_id: str):
         """Delete a project"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").delete().eq("id", str(project_id)).execute()
+        self.supabase.table("projects").delete().eq("id", str(project_id)).execute()
+        self._cache.invalidate("stats", "dashboard", "pending", "categories", "tutorial")
+        self._update_id_set(remove=[str(project_id)])
     
-    def update_project_analysis(self, project_id: str, analysis: dict):
-        """Update AI analysis fields"""
+    def clear_database(self):
+        """Delete every project (scan history, settings and news sources are kept)"""
         self._ensure_client()
-        now = datetime.now().isoformat()
+        # Let queued updates land first so none of them races the delete
+        self.flush()
+        # PostgREST refuses an unfiltered DELETE; id is never empty, so this matches every row
+        self.supabase.table("projects").delete().neq("id", "").execute()
+        self._cache.invalidate("stats", "dashboard", "pending", "categories", "tutorial")
+        if self._redis is not None:
+            try:
+                self._redis.delete(PROJECT_IDS_KEY)
+            except Exception as e:
+                print(f"[Database] Redis id set reset failed: {e}")
+    
+    def _load_id_set(self) -> bool:
+        """Make sure the Redis id set exists, building it from the table if needed; False without Redis"""
+        if self._redis is None:
+            return False
+        try:
+            if self._redis.exists(PROJECT_IDS_KEY):
+                return True
+            # Build under a temporary key and rename, so readers never see a half-filled set.
+            # The "" member keeps the key alive for an empty table (ids are never empty).
+            building = f"{PROJECT_IDS_KEY}:building"
+            pipe = self._redis.pipeline()
+            pipe.delete(building)
+            pipe.sadd(building, "")
+            chunk = []
+            for row in self.iter_all_projects(columns="id", page_size=1000):
+                chunk.append(row["id"])
+                if len(chunk) >= 1000:
+                    pipe.sadd(building, *chunk)
+                    chunk = []
+            if chunk:
+                pipe.sadd(building, *chunk)
+            pipe.rename(building, PROJECT_IDS_KEY)
+            pipe.expire(PROJECT_IDS_KEY, PROJECT_IDS_TTL)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"[Database] Redis id set unavailable: {e}")
+            return False
+    
+    def _update_id_set(self, add: List[str] = (), remove: List[str] = ()):
+        """Keep the Redis id set in step with writes (skipped until the set has been built)"""
+        if self._redis is None:
+            return
+        try:
+            if not self._redis.exists(PROJECT_IDS_KEY):
+                return
+            if add:
+                self._redis.sadd(PROJECT_IDS_KEY, *add)
+            if remove:
+                self._redis.srem(PROJECT_IDS_KEY, *remove)
+        except Exception as e:
+            print(f"[Database] Redis id set update failed: {e}")
+    
+    def update_project_analysis(self, project_id: str, analysis: dict, **fields):
+        """Update AI analysis fields, plus any extra columns in the same write"""
+        self._ensure_client()
+        now = datetime.now(timezone.utc).isoformat()
         
         update_data = {
             "ai_summary": analysis.get('summary'),
@@ -92,37 +406,123 @@ class Database:
             "ai_model_name": analysis.get('model_name'),  # Store which model did the analysis
             "last_analyzed": now
         }
+        update_data.update(fields)
         
-        with self.lock:
-            self.supabase.table("projects").update(update_data).eq("id", str(project_id)).execute()
+        self._enqueue_update(project_id, update_data)
             
     def update_ai_analysis(self, project_id: str, analysis: dict):
         """Alias for backward compatibility"""
         self.update_project_analysis(project_id, analysis)
     
+    def update_project_fields(self, project_id: str, **fields):
+        """Update several columns of one project in a single write"""
+        if not fields:
+            return
+        self._ensure_client()
+        self._enqueue_update(project_id, fields)
+    
     def update_project_tutorial(self, project_id: str, tutorial: str):
         """Update tutorial content"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"ai_tutorial": tutorial}).eq("id", str(project_id)).execute()
+        self._enqueue_update(project_id, {"ai_tutorial": tutorial})
     
     def update_project_rag_summary(self, project_id: str, summary: str):
         """Update RAG summary"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"ai_rag_summary": summary}).eq("id", str(project_id)).execute()
+        self._enqueue_update(project_id, {"ai_rag_summary": summary})
     
     def update_project_screenshot(self, project_id: str, screenshot_path: str):
         """Update screenshot path"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"screenshot": screenshot_path}).eq("id", str(project_id)).execute()
+        self._enqueue_update(project_id, {"screenshot": screenshot_path})
     
     def update_project_visual_summary(self, project_id: str, summary: str):
         """Update visual summary"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("projects").update({"ai_visual_summary": summary}).eq("id", str(project_id)).execute()
+        self._enqueue_update(project_id, {"ai_visual_summary": summary})
+    
+    # ========== Background Writes ==========
+    
+    def _enqueue_update(self, project_id: str, fields: dict):
+        """Queue a partial update; later writes to the same key win"""
+        if "ai_tutorial" in fields:
+            # Write-through so get_tutorial sees the new text before the queue is flushed
+            self._cache.set("tutorial", (str(project_id),), fields["ai_tutorial"], TUTORIAL_TTL, TUTORIAL_CACHE_SIZE)
+        self._write_queue.put((str(project_id), fields, 0))
+    
+    def flush(self) -> List[str]:
+        """Block until every queued update has been written or given up on
+        
+        Returns the ids of projects whose updates were dropped since the previous flush();
+        write_failures counts every dropped update over the lifetime of this instance.
+        """
+        self._write_queue.join()
+        with self._write_lock:
+            failed, self._failed_writes = self._failed_writes, []
+        return failed
+    
+    def _write_worker(self):
+        """Collect queued updates into batches and write them"""
+        while True:
+            batch = [self._write_queue.get()]
+            deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+            while len(batch) < WRITE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._write_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._retry_or_drop(self._flush_batch(batch))
+            except Exception:
+                logger.exception("Background write batch crashed; dropped %d updates", len(batch))
+                self._record_failures(sorted({item[0] for item in batch}))
+            finally:
+                # Retries are requeued before task_done, so flush() keeps waiting for them
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def _flush_batch(self, batch: List[tuple]) -> List[tuple]:
+        """One UPDATE per project with all of its queued fields merged; returns the failed updates
+        
+        (A multi-row upsert would need every NOT NULL column, so partial rows are sent as updates.)
+        """
+        merged: Dict[str, dict] = {}
+        attempts: Dict[str, int] = {}
+        for project_id, fields, attempt in batch:
+            merged.setdefault(project_id, {}).update(fields)
+            attempts[project_id] = max(attempts.get(project_id, 0), attempt)
+        
+        failed = []
+        for project_id, fields in merged.items():
+            try:
+                self.supabase.table("projects").update(fields).eq("id", project_id).execute()
+            except Exception as e:
+                logger.warning("Background update failed for %s (attempt %d): %s",
+                               project_id, attempts[project_id] + 1, e)
+                failed.append((project_id, fields, attempts[project_id] + 1))
+        # Analysis results change the analyzed/pending counts
+        self._cache.invalidate("stats", "dashboard", "pending")
+        return failed
+    
+    def _retry_or_drop(self, failed: List[tuple]):
+        """Requeue failed updates until they run out of attempts, then record them as dropped"""
+        retry = [item for item in failed if item[2] <= WRITE_MAX_RETRIES]
+        dropped = [item[0] for item in failed if item[2] > WRITE_MAX_RETRIES]
+        if dropped:
+            logger.error("Dropping background updates after %d retries: %s", WRITE_MAX_RETRIES, dropped)
+            self._record_failures(dropped)
+        if retry:
+            time.sleep(WRITE_RETRY_DELAY * max(item[2] for item in retry))
+            for item in retry:
+                self._write_queue.put(item)
+    
+    def _record_failures(self, project_ids: List[str]):
+        with self._write_lock:
+            self._failed_writes.extend(project_ids)
+            self.write_failures += len(project_ids)
     
     def get_projects_needing_analysis(self, limit: int = 10, target_model: str = "120b") -> List[Dict]:
         """
@@ -131,68 +531,105 @@ class Database:
         """
         self._ensure_client()
         
-        # 1. First, try to get completely unanalyzed projects
-        response = self.supabase.table("projects").select("*").is_("ai_summary", "null").limit(limit).execute()
-        pending = [dict(row) for row in response.data]
+        if target_model == "120b":
+            try:
+                # The view's filter matches the idx_projects_needing_analysis partial index,
+                # so only pending rows are scanned; unanalyzed ones come first, then by stars
+                response = self.supabase.table("projects_needing_analysis").select(ANALYSIS_COLUMNS)\
+                    .order("unanalyzed", desc=True).order("stars", desc=True)\
+                    .limit(limit).execute()
+                return response.data or []
+            except Exception as e:
+                print(f"projects_needing_analysis view unavailable, filtering projects: {e}")
         
-        # 2. If we still have room, get projects that haven't been analyzed by the target_model
-        if len(pending) < limit:
-            remaining = limit - len(pending)
-            # Use 'not ilike' if possible, or just fetch and filter locally for simplicity since limit is small
-            # Supabase doesn't have a direct 'not ilike' in the basic client wrapper sometimes, 
-            # let's just fetch projects that have a summary but NO model name, or model name != target_model
-            response = self.supabase.table("projects").select("*")\
-                .not_.is_("ai_summary", "null")\
-                .not_.ilike("ai_model_name", f"%{target_model}%")\
-                .limit(remaining).execute()
-            pending.extend([dict(row) for row in response.data])
-            
-        return pending
+        # One query: unanalyzed rows, or rows analyzed by another (or unknown) model.
+        # NULLS FIRST keeps completely unanalyzed projects at the front.
+        response = self.supabase.table("projects").select(ANALYSIS_COLUMNS)\
+            .or_(f"ai_summary.is.null,ai_model_name.is.null,ai_model_name.not.ilike.*{target_model}*")\
+            .order("ai_summary", nullsfirst=True)\
+            .limit(limit).execute()
+        return response.data or []
         
     def get_unanalyzed_projects(self, limit: int = 10) -> List[Dict]:
         """Alias for backward compatibility"""
         return self.get_projects_needing_analysis(limit=limit)
     
-    def search_projects(self, query: str) -> List[Dict]:
-        """Full-text search on projects"""
+    def search_projects(self, query: str, limit: int = 50, columns: str = DEFAULT_LIST_COLS) -> List[Dict]:
+        """Full-text search on projects, ranked by relevance (ILIKE fallback)"""
         self._ensure_client()
-        # Use PostgreSQL ilike for basic search
-        response = self.supabase.table("projects").select("*").or_(
-            f"name.ilike.%{query}%,description.ilike.%{query}%,ai_rag_summary.ilike.%{query}%"
-        ).execute()
-        return [dict(row) for row in response.data]
+        try:
+            # search_projects() runs ranked FTS and, when that finds nothing (unspaced CJK), an escaped ILIKE in one call
+            response = self.supabase.rpc("search_projects", {"q": query, "lim": limit}).execute()
+            return response.data or []
+        except Exception as e:
+            print(f"Search RPC failed (search_projects missing?), using ILIKE: {e}")
+        
+        pattern = self._ilike_pattern(query)
+        response = self.supabase.table("projects").select(columns).or_(
+            f"name.ilike.{pattern},description.ilike.{pattern},ai_rag_summary.ilike.{pattern}"
+        ).order("stars", desc=True).limit(limit).execute()
+        return response.data or []
+    
+    @staticmethod
+    def _ilike_pattern(query: str) -> str:
+        """Build a quoted %query% value safe to embed in a PostgREST or_() filter"""
+        # Escape LIKE wildcards so they match literally
+        like = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        # Quote for PostgREST so , . : ( ) cannot inject extra filter terms
+        quoted = f"%{like}%".replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{quoted}"'
     
+    @ttl_cached("pending")
     def get_pending_count(self) -> int:
         """Get count of projects pending analysis (lacking 120B analysis)"""
         self._ensure_client()
         # Strictly count those without 120b analysis
         try:
-            total_res = self.supabase.table("projects").select("id", count="exact").execute()
-            total = total_res.count or 0
-            
-            analyzed_res = self.supabase.table("projects").select("id", count="exact").ilike("ai_model_name", "%120b%").execute()
-            analyzed = analyzed_res.count or 0
-            
-            return max(0, total - analyzed)
+            # One consistent count, no rows returned (head=True)
+            response = self.supabase.table("projects").select("id", count="exact", head=True)\
+                .or_("ai_model_name.is.null,ai_model_name.not.ilike.*120b*").execute()
+            return response.count or 0
         except Exception as e:
             print(f"Error getting pending count: {e}")
             return 0
     
     def get_tutorial(self, project_id: str) -> Optional[str]:
-        """Get tutorial for a project"""
-        project = self.get_project(project_id)
-        if project:
-            return project.get('ai_tutorial')
+        """Get tutorial for a project (cached per project)"""
+        key = (str(project_id),)
+        tutorial, hit = self._cache.get("tutorial", key)
+        if hit:
+            return tutorial
+        tutorial = self.get_tutorial_direct(project_id)
+        self._cache.set("tutorial", key, tutorial, TUTORIAL_TTL, TUTORIAL_CACHE_SIZE)
+        return tutorial
+    
+    def get_tutorial_direct(self, project_id: str) -> Optional[str]:
+        """Fetch only the ai_tutorial column, bypassing the cache"""
+        self._ensure_client()
+        response = self.supabase.table("projects").select("ai_tutorial").eq("id", str(project_id)).maybe_single().execute()
+        if response and response.data:
+            return response.data.get('ai_tutorial')
         return None
     
+    @ttl_cached("stats")
     def get_stats(self) -> Dict:
-        """Get database statistics"""
+        """Get database statistics (one get_project_stats() call, per-query fallback)"""
         self._ensure_client()
+        try:
+            response = self.supabase.rpc("get_project_stats").execute()
+            row = response.data[0]
+            return {
+                "total_projects": row["total"],
+                "analyzed_projects": row["analyzed"],
+                "categories": row["categories"]
+            }
+        except Exception as e:
+            print(f"get_project_stats() unavailable, counting per query: {e}")
         
         # Total projects
         total = 0
         try:
-            total_response = self.supabase.table("projects").select("id", count="exact").execute()
+            total_response = self.supabase.table("projects").select("id", count="exact", head=True).execute()
             total = total_response.count if total_response.count is not None else 0
         except Exception as e:
             print(f"Error getting total count: {e}")
@@ -201,14 +638,14 @@ class Database:
         analyzed = 0
         try:
             # Try to count only those analyzed by 120B model
-            analyzed_response = self.supabase.table("projects").select("id", count="exact")\
+            analyzed_response = self.supabase.table("projects").select("id", count="exact", head=True)\
                 .ilike("ai_model_name", "%120b%").execute()
             analyzed = analyzed_response.count if analyzed_response.count is not None else 0
         except Exception as e:
             # Fallback: Count any project with an ai_summary
             print(f"Error getting 120B count (probably column missing): {e}")
             try:
-                analyzed_response = self.supabase.table("projects").select("id", count="exact").not_.is_("ai_summary", "null").execute()
+                analyzed_response = self.supabase.table("projects").select("id", count="exact", head=True).not_.is_("ai_summary", "null").execute()
                 analyzed = analyzed_response.count if analyzed_response.count is not None else 0
             except Exception as e2:
                 print(f"Error getting basic analyzed count: {e2}")
@@ -216,9 +653,7 @@ class Database:
         # Categories
         cat_count = 0
         try:
-            categories_response = self.supabase.table("projects").select("category").execute()
-            categories = list(set(row['category'] for row in categories_response.data))
-            cat_count = len(categories)
+            cat_count = len(self.get_all_categories_summary())
         except Exception as e:
             print(f"Error getting categories: {e}")
             
@@ -228,6 +663,24 @@ class Database:
             "categories": cat_count
         }
     
+    @ttl_cached("dashboard")
+    def get_dashboard_snapshot(self) -> Dict:
+        """Stats, pending count, recent scans and category counts in one dashboard_snapshot() call"""
+        self._ensure_client()
+        try:
+            response = self.supabase.rpc("dashboard_snapshot").execute()
+            if response.data:
+                return response.data
+        except Exception as e:
+            print(f"dashboard_snapshot() unavailable, querying separately: {e}")
+        
+        return {
+            "stats": self.get_stats(),
+            "pending": self.get_pending_count(),
+            "recent_scans": self.get_recent_scans(),
+            "categories": self.get_all_categories_summary(),
+        }
+    
     # ========== Scan History ==========
     
     def log_scan(self, category: str, found: int, new: int, status: str):
@@ -239,38 +692,38 @@ class Database:
             "projects_new": new,
             "status": status
         }
-        with self.lock:
-            self.supabase.table("scan_history").insert(data).execute()
+        self.supabase.table("scan_history").insert(data).execute()
+        self._cache.invalidate("stats", "dashboard", "categories")
     
     def get_recent_scans(self, limit: int = 20) -> List[Dict]:
         """Get recent scan history"""
         self._ensure_client()
         response = self.supabase.table("scan_history").select("*").order("scan_time", desc=True).limit(limit).execute()
-        return [dict(row) for row in response.data]
+        return response.data or []
     
     # ========== Settings ==========
     
     def get_setting(self, key: str, default: str = None) -> Optional[str]:
         """Get a setting value"""
         self._ensure_client()
-        response = self.supabase.table("settings").select("value").eq("key", key).execute()
-        if response.data:
-            return response.data[0]['value']
+        response = self.supabase.table("settings").select("value").eq("key", key).limit(1).maybe_single().execute()
+        if response and response.data:
+            return response.data['value']
         return default
     
     def set_setting(self, key: str, value: str):
         """Set a setting value"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("settings").upsert({"key": key, "value": value}).execute()
+        self.supabase.table("settings").upsert({"key": key, "value": value}).execute()
     
     # ========== News Sources ==========
     
+    @ttl_cached("news_sources")
     def get_news_sources(self) -> List[Dict]:
         """Get all news sources"""
         self._ensure_client()
         response = self.supabase.table("news_sources").select("*").execute()
-        return [dict(row) for row in response.data]
+        return response.data or []
     
     def add_news_source(self, name: str, url: str):
         """Add a news source"""
@@ -279,37 +732,38 @@ class Database:
             "name": name,
             "url": url
         }
-        with self.lock:
-            try:
-                self.supabase.table("news_sources").insert(data).execute()
-            except Exception as e:
-                print(f"Error adding news source (may already exist): {e}")
+        try:
+            self.supabase.table("news_sources").insert(data).execute()
+        except Exception as e:
+            print(f"Error adding news source (may already exist): {e}")
+        self._cache.invalidate("news_sources")
     
     def delete_news_source(self, source_id: int):
         """Delete a news source"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("news_sources").delete().eq("id", source_id).execute()
+        self.supabase.table("news_sources").delete().eq("id", source_id).execute()
+        self._cache.invalidate("news_sources")
     
     def update_news_source_scan_time(self, source_id: int):
         """Update last scan time for a news source"""
         self._ensure_client()
-        with self.lock:
-            self.supabase.table("news_sources").update({"last_scanned": datetime.now().isoformat()}).eq("id", source_id).execute()
+        self.supabase.table("news_sources").update({"last_scanned": datetime.now(timezone.utc).isoformat()}).eq("id", source_id).execute()
+        self._cache.invalidate("news_sources")
     
+    @ttl_cached("categories")
     def get_all_categories_summary(self) -> Dict:
         """Get summary of projects by category"""
         self._ensure_client()
+        try:
+            # Aggregated server-side: one row per category
+            response = self.supabase.table("projects_category_counts").select("category,n").execute()
+            return {row['category']: row['n'] for row in response.data}
+        except Exception as e:
+            print(f"projects_category_counts view unavailable, counting client-side: {e}")
+        
         try:
             response = self.supabase.table("projects").select("category").execute()
-            
-            # Count projects per category
-            category_counts = {}
-            for row in response.data:
-                cat = row.get('category', 'other')
-                category_counts[cat] = category_counts.get(cat, 0) + 1
-            
-            return category_counts
+            return dict(Counter(row.get('category', 'other') for row in response.data))
         except Exception as e:
             print(f"Error getting categories summary: {e}")
             return {}
@@ -7,15 +7,9 @@ from config import SUPABASE_URL, SUPABASE_KEY
 
 client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Get distinct categories
-response = client.table("projects").select("category").execute()
-
-# Count by category
-category_counts = {}
-for row in response.data:
-    cat = row.get('category', 'unknown')
-    category_counts[cat] = category_counts.get(cat, 0) + 1
+# Counted server-side by the projects_category_counts view (GROUP BY category)
+response = client.table("projects_category_counts").select("category,n").order("n", desc=True).execute()
 
 print("Categories found in database:")
-for cat, count in sorted(category_counts.items(), key=lambda x: -x[1]):
-    print(f"  {cat}: {count}")
+for row in response.data:
+    print(f"  {row['category']}: {row['n']}")
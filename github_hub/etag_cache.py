@@ -0,0 +1,76 @@
+# GitHub Hub - GitHub API 响应缓存 (ETag 条件请求 + Redis / 内存 LRU)
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from .config import REDIS_URL
+
+TTL_SECONDS = 24 * 3600     # 条目保留时间，过期后重新完整请求
+FRESH_SECONDS = 3600        # 新鲜期内直接返回缓存，不发请求
+MEMORY_MAXSIZE = 1024
+
+# (etag, body, stored_at)
+Entry = Tuple[Optional[str], Any, float]
+
+
+class ETagCache:
+    """按 key 缓存 (ETag, 响应内容)
+
+    配置了 REDIS_URL 且安装了 redis 时使用 Redis (多进程共享)，否则使用进程内 LRU。
+    """
+
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, maxsize: int = MEMORY_MAXSIZE):
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis and redis_url:
+            try:
+                self._redis = redis.Redis.from_url(redis_url)
+            except Exception as e:
+                print(f"Warning: Could not connect to Redis at {redis_url}: {e}")
+
+    def get(self, key: str) -> Optional[Entry]:
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(key)
+                if raw is not None:
+                    etag, body, stored_at = json.loads(raw)
+                    return etag, body, stored_at
+                return None
+            except Exception as e:
+                print(f"[ETagCache] Redis read failed: {e}")
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > TTL_SECONDS:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def set(self, key: str, etag: Optional[str], body: Any):
+        entry = (etag, body, time.time())
+        if self._redis is not None:
+            try:
+                self._redis.set(key, json.dumps(entry), ex=TTL_SECONDS)
+                return
+            except Exception as e:
+                print(f"[ETagCache] Redis write failed: {e}")
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def is_fresh(entry: Entry) -> bool:
+        return time.time() - entry[2] < FRESH_SECONDS
@@ -0,0 +1,94 @@
+# GitHub Hub - LLM 结果缓存 (内存 LRU + 磁盘)
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+CACHE_DIR = "data/llm_cache"
+MEMORY_MAXSIZE = 4096
+
+_MISSING = object()
+
+
+class LLMCache:
+    """两级缓存：进程内 LRU，未命中时再查磁盘 (需安装 diskcache)"""
+
+    def __init__(self, directory: str = CACHE_DIR, maxsize: int = MEMORY_MAXSIZE):
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if diskcache:
+            try:
+                self._disk = diskcache.Cache(directory)
+            except Exception as e:
+                print(f"Warning: Could not open LLM disk cache at {directory}: {e}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self._disk is not None:
+            value = self._disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self._remember(key, value)
+                return value
+        return default
+
+    def set(self, key: str, value: Any):
+        self._remember(key, value)
+        if self._disk is not None:
+            try:
+                self._disk.set(key, value)
+            except Exception as e:
+                print(f"[LLMCache] Disk write failed: {e}")
+
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+
+_cache = LLMCache()
+
+
+def project_cache_key(project: Dict, readme: Optional[str], model: str, *extra: str) -> str:
+    """项目内容指纹：full_name + updated_at + README 内容摘要 + 模型名"""
+    readme_digest = hashlib.blake2b((readme or '').encode('utf-8'), digest_size=8).hexdigest()
+    raw = "|".join([
+        project['full_name'],
+        str(project.get('updated_at') or ''),
+        readme_digest,
+        model,
+        *extra,
+    ])
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def cached(key_fn: Callable[..., str]):
+    """缓存 Agent 异步方法的返回值
+
+    key_fn 接收与被装饰方法相同的参数 (不含 self)。
+    方法抛出异常时不写入缓存，因此被装饰的方法不应自行吞掉错误返回默认值。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = f"{func.__name__}:{key_fn(*args, **kwargs)}"
+            hit = _cache.get(key, _MISSING)
+            if hit is not _MISSING:
+                return hit
+            result = await func(self, *args, **kwargs)
+            _cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
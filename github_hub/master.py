@@ -1,18 +1,60 @@
 # GitHub Hub - Master Agent (任务调度)
+import asyncio
+import json
+import os
 import threading
-import traceback
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Callable
+from typing import Dict, Iterator, Optional
+from .aio import get_loop, in_loop_thread, iter_sync, run_sync
 from .database import Database
-from .crawler import CrawlerAgent
+from .crawler import CrawlerAgent, dedupe_across_categories
 from .analyzer import AnalyzerAgent, ContentAgent
-from .config import CATEGORIES, DISCOVERY_URLS
+from .config import CATEGORIES, DISCOVERY_URLS, RUN_SCHEDULER, SCAN_CONFIG
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dump_json(obj) -> bytes:
+    """序列化为 UTF-8 JSON 字节：有 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+# 自动分析检查间隔 (秒)
+AUTO_ANALYSIS_INTERVAL = 600
+
+# 单次批量分析最多处理的项目数，以及待处理队列长度 (同时也是每次从数据库补充的行数)
+BATCH_ANALYSIS_LIMIT = 100
+ANALYZE_QUEUE_SIZE = 32
+
+# 每个日志订阅者的消息队列长度 (环形缓冲：满了丢弃最旧的消息，不阻塞任务)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# 混合搜索结果缓存 (秒)，以及 GitHub 远程搜索无结果的负缓存 (秒)
+SEARCH_CACHE_TTL = 60
+REMOTE_MISS_TTL = 600
+SEARCH_CACHE_SIZE = 512
+
+# 后台长任务 (扫描 / 批量分析 / 添加项目后的分析) 同时最多运行的数量
+BACKGROUND_WORKERS = 2
+
+
+async def _new_queue(maxsize: int) -> asyncio.Queue:
+    """在后台事件循环上创建队列 (由 subscribe 通过 run_sync 调用)"""
+    return asyncio.Queue(maxsize=maxsize)
+
 
 class MasterAgent:
     """主控 Agent - 调度所有子任务"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, run_scheduler: bool = RUN_SCHEDULER):
         # db_path is now ignored - Database class uses Supabase
         self.db = Database(db_path)
         self.crawler = CrawlerAgent()
@@ -21,11 +63,17 @@ class MasterAgent:
         self.is_running = False
         self.current_task = None
         self.progress = {"total": 0, "done": 0, "current": ""}
-        self.callbacks = []
-        self.auto_analysis_timer = None
+        self.subscribers = []
+        self._search_cache = {}
+        self._remote_misses = {}
+        self._search_lock = threading.Lock()
+        # 扫描 / 批量分析 / 单项目分析等长任务共用的有界线程池
+        self.background = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="bg")
+        self.auto_analysis_task = None
         
-        # Start auto-analysis scheduler
-        self.start_auto_analysis_scheduler()
+        # Start auto-analysis scheduler (只在负责定时任务的进程中运行)
+        if run_scheduler:
+            self.start_auto_analysis_scheduler()
 
         # Ensure default news sources exist
         self._ensure_news_sources()
@@ -45,30 +93,56 @@ class MasterAgent:
             print(f"Error initializing sources: {e}")
     
     def start_auto_analysis_scheduler(self):
-        """启动后台自动分析调度器，每 10 分钟检查一次"""
-        def check_and_analyze():
-            while True:
-                time.sleep(600)  # Wait 10 minutes
-                if not self.is_running:
-                    pending_count = self.db.get_pending_count()
-                    if pending_count > 0:
-                        self._notify(f"🤖 Auto-analysis starting: {pending_count} projects pending...", "info")
-                        threading.Thread(target=self.run_batch_analysis, daemon=True).start()
-        
-        self.auto_analysis_timer = threading.Thread(target=check_and_analyze, daemon=True)
-        self.auto_analysis_timer.start()
+        """在后台事件循环上启动自动分析任务，每 10 分钟检查一次"""
+        self.auto_analysis_task = asyncio.run_coroutine_threadsafe(self._auto_analysis_loop(), get_loop())
     
-    def add_callback(self, callback: Callable):
-        """添加进度回调"""
-        self.callbacks.append(callback)
+    async def _auto_analysis_loop(self):
+        while True:
+            await asyncio.sleep(AUTO_ANALYSIS_INTERVAL)
+            try:
+                if self.is_running:
+                    continue
+                pending_count = await asyncio.to_thread(self.db.get_pending_count)
+                if pending_count > 0:
+                    self._notify(f"🤖 Auto-analysis starting: {pending_count} projects pending...", "info")
+                    await self.run_batch_analysis_async()
+            except Exception as e:
+                print(f"[AutoAnalysis] Error: {e}")
     
+    def subscribe(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE) -> asyncio.Queue:
+        """订阅进度消息，返回在后台事件循环上创建的有界队列，由订阅者在该循环上消费
+
+        Python 3.9 的 asyncio.Queue 在创建时绑定当前线程的事件循环，所以不能在调用方 (如 uvicorn) 的线程里创建。
+        """
+        if in_loop_thread():
+            queue = asyncio.Queue(maxsize=maxsize)
+        else:
+            queue = run_sync(_new_queue(maxsize))
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """取消订阅"""
+        try:
+            self.subscribers.remove(queue)
+        except ValueError:
+            pass
+
+    def _publish(self, payload: dict):
+        """在事件循环线程中把消息放入每个订阅队列 (慢订阅者队列满时丢弃最旧的一条)"""
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
     def _notify(self, message: str, level: str = "info"):
-        """通知所有回调"""
-        for cb in self.callbacks:
-            try:
-                cb({"message": message, "level": level, "time": datetime.now().isoformat()})
-            except:
-                pass
+        """通知所有订阅者：只做 put_nowait，不会被慢消费者阻塞"""
+        payload = {"message": message, "level": level, "time": datetime.now().isoformat()}
+        # asyncio.Queue 不是线程安全的，其它线程里的调用转交给事件循环执行
+        if in_loop_thread():
+            self._publish(payload)
+        else:
+            get_loop().call_soon_threadsafe(self._publish, payload)
 
     def stop_task(self):
         """停止当前任务"""
@@ -101,51 +175,56 @@ class MasterAgent:
             # 排序：数量少的排前面
             sorted_cats = []
             for cat_id, cat_config in CATEGORIES.items():
-                count = cat_counts.get(cat_id, {}).get('count', 0)
+                count = cat_counts.get(cat_id, 0)
                 sorted_cats.append((cat_id, cat_config, count))
             
             sorted_cats.sort(key=lambda x: x[2])
             
-            for cat_id, cat_config, count in sorted_cats:
-                self.progress["current"] = f"Crawling: {cat_config['name']} (Current: {count})"
-                self._notify(f"Scanning {cat_config['name']} (Current: {count})...", "info")
-                
-                if cat_id == "trending":
-                    projects = self.crawler.get_trending()
-                elif cat_id == "new_releases":
-                    projects = self.crawler.get_new_releases()
-                else:
-                    projects = self.crawler.search_by_keywords(cat_config["keywords"], cat_id)
-                
-                for project in projects:
-                    self.db.upsert_project(project)
+            # 多线程并发抓取 (按优先级顺序提交，GitHub 请求频率由爬虫的令牌桶统一控制)
+            fetched = {}
+            with ThreadPoolExecutor(max_workers=SCAN_CONFIG["crawl_concurrency"]) as pool:
+                futures = {}
+                for cat_id, cat_config, count in sorted_cats:
+                    self._notify(f"Scanning {cat_config['name']} (Current: {count})...", "info")
+                    futures[pool.submit(self.crawler.scan_category, cat_id, cat_config)] = (cat_id, cat_config)
                 
+                for future in as_completed(futures):
+                    cat_id, cat_config = futures[future]
+                    fetched[cat_id] = future.result()
+                    self.progress["done"] += 1
+                    self.progress["current"] = f"Crawled: {cat_config['name']}"
+            
+            # 多个分类命中的同一项目归入优先级最高的分类，全部结果一次批量写入
+            fetched = dedupe_across_categories({cat_id: fetched[cat_id] for cat_id, _, _ in sorted_cats})
+            self.db.upsert_projects([p for projects in fetched.values() for p in projects])
+            for cat_id, projects in fetched.items():
                 results["crawl"][cat_id] = len(projects)
-                self.progress["done"] += 1
-                self._notify(f"Found {len(projects)} in {cat_config['name']}", "success")
+                self._notify(f"Found {len(projects)} in {CATEGORIES[cat_id]['name']}", "success")
             
             # Step 2: AI 分析未处理的项目
             self._notify("Starting AI analysis...", "info")
             pending = self.db.get_projects_needing_analysis(limit=50)
-            self.progress = {"total": len(pending), "done": 0, "current": "Analyzing"}
-            
-            for project in pending:
-                self.progress["current"] = f"Analyzing: {project['name']}"
-                
-                # 获取 README
-                readme = self.crawler.get_readme(project['full_name'])
-                
-                # AI 分析
-                analysis = self.analyzer.analyze_project(project, readme)
+            self.progress = {"total": len(pending), "done": 0, "current": "Fetching READMEs"}
+
+            # 获取 README (GitHub API, 并发请求，频率由爬虫的令牌桶控制)
+            with ThreadPoolExecutor(max_workers=SCAN_CONFIG["crawl_concurrency"]) as pool:
+                readmes = list(pool.map(lambda project: self.crawler.get_readme(project['full_name']), pending))
+
+            # AI 分析 (并发请求 LM Studio)
+            self.progress["current"] = f"Analyzing {len(pending)} projects"
+            analyses = self.analyzer.analyze_batch(pending, readmes)
+
+            for project, analysis in zip(pending, analyses):
                 self.db.update_ai_analysis(project['id'], analysis)
-                
+
                 results["analyze"] += 1
                 self.progress["done"] += 1
                 self._notify(f"Analyzed: {project['name']}", "success")
-                
-                # 避免 API 限制
-                time.sleep(0.5)
             
+            # 等待后台写入完成，再归档数据
+            failed_writes = self.db.flush()
+            if failed_writes:
+                self._notify(f"Failed to save analysis for {len(failed_writes)} projects", "error")
             self._notify("Full scan completed!", "success")
             
             # Step 3: 自动归档数据到本地文件夹
@@ -162,9 +241,6 @@ class MasterAgent:
     
     def archive_data(self):
         """归档数据到本地文件夹"""
-        import os
-        import json
-        
         date_str = datetime.now().strftime("%Y-%m-%d")
         archive_dir = f"data/archive/{date_str}"
         os.makedirs(archive_dir, exist_ok=True)
@@ -172,24 +248,18 @@ class MasterAgent:
         self._notify(f"Archiving data to {archive_dir}...", "info")
         
         try:
-            # 1. 导出所有数据
-            all_projects = self.db.get_projects_by_category("all", limit=10000) # Hack to get all? No, need new DB method or iterate categories
-            # Better: iterate categories
-            
             summary_stats = {"total": 0, "breakdown": {}}
             
             for cat_id, cat_config in CATEGORIES.items():
-                projects = self.db.get_projects_by_category(cat_id, limit=1000)
-                if not projects:
-                    continue
-                    
-                # 保存每个分类的 JSON
+                # 逐行写入每个分类的 JSON，不在内存中保留整个分类
                 file_path = f"{archive_dir}/{cat_id}.json"
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump([dict(p) for p in projects], f, ensure_ascii=False, indent=2)
+                count = self._archive_category(cat_id, file_path)
+                if not count:
+                    os.remove(file_path)
+                    continue
                 
-                summary_stats["breakdown"][cat_id] = len(projects)
-                summary_stats["total"] += len(projects)
+                summary_stats["breakdown"][cat_id] = count
+                summary_stats["total"] += count
             
             # 保存统计信息
             with open(f"{archive_dir}/_stats.json", 'w', encoding='utf-8') as f:
@@ -201,8 +271,25 @@ class MasterAgent:
             print(f"Archive error: {e}")
             self._notify(f"Archive error: {e}", "error")
 
+    def _archive_category(self, cat_id: str, file_path: str) -> int:
+        """把一个分类的项目流式写成 JSON 数组，返回行数"""
+        count = 0
+        with open(file_path, 'wb') as f:
+            f.write(b'[\n')
+            for project in self.db.iter_projects_by_category(cat_id):
+                if count:
+                    f.write(b',\n')
+                f.write(_dump_json(project))
+                count += 1
+            f.write(b'\n]')
+        return count
+
     def run_batch_analysis(self) -> Dict:
         """批量分析所有未分析的项目 (使用 120B 大模型)"""
+        return run_sync(self.run_batch_analysis_async())
+    
+    async def run_batch_analysis_async(self) -> Dict:
+        """run_batch_analysis 的协程版本，数据库等同步调用放到线程里执行"""
         if self.is_running:
             return {"error": "Task already running"}
             
@@ -210,70 +297,13 @@ class MasterAgent:
         self.current_task = "batch_analysis"
         
         try:
-            # 获取需要分析的项目 (缺 120B 结果的)
-            pending = self.db.get_projects_needing_analysis(limit=100)
-            
-            self._notify(f"Starting batch analysis for {len(pending)} projects using High-Quality Model...", "info")
-            self.progress = {"total": len(pending), "done": 0, "current": "Batch Analysis"}
+            self._notify("Starting batch analysis using High-Quality Model...", "info")
+            self.progress = {"total": 0, "done": 0, "current": "Batch Analysis"}
             
-            analyzed_count = 0
-            total = len(pending)
-            
-            for idx, project in enumerate(pending, 1):
-                if not self.is_running: break
-                
-                progress_tag = f"[{idx}/{total}]"
-                self.progress["current"] = f"Analyzing: {project['name']}"
-                self._notify(f"{progress_tag} 正在分析 {project['name']}...", "info")
-                
-                # 始终获取 README (分析需要)
-                readme = self.crawler.get_readme(project['full_name'])
-                
-                # 1. 生成 AI Analysis (如果不是 120B 生成的或还没生成)
-                is_120b = project.get('ai_model_name') and '120b' in project['ai_model_name'].lower()
-                
-                if not is_120b:
-                    analysis = self.analyzer.analyze_project(project, readme)
-                    self.db.update_project_analysis(project['id'], analysis)
-                else:
-                    analysis = {"summary": project.get('ai_summary')}
-                
-                # 1.1 生成 RAG Summary (如果缺失)
-                if not project.get('ai_rag_summary') or not is_120b:
-                    rag_summary = self.analyzer.generate_rag_summary(project, readme)
-                    if rag_summary:
-                        self.db.update_project_rag_summary(project['id'], rag_summary)
-                
-                # 2. 抓取截图 (如果缺失)
-                screenshot_path = project.get('screenshot')
-                if not screenshot_path:
-                    self._notify(f"{progress_tag} 正在截图 {project['name']}...", "info")
-                    screenshot_path = self.crawler.capture_screenshot(project['url'], project['id'])
-                    if screenshot_path:
-                        self.db.update_project_screenshot(project['id'], screenshot_path)
-                
-                # 3. 视觉分析 (OCR & UI)
-                visual_summary = ""
-                if screenshot_path:
-                    self._notify(f"{progress_tag} 视觉分析 (OCR) {project['name']}...", "info")
-                    visual_summary = self.analyzer.analyze_with_vision(project, screenshot_path)
-                    # 视觉摘要也需要更新
-                    self.db.update_project_visual_summary(project['id'], visual_summary)
-
-                # 4. 生成深度教程
-                self._notify(f"{progress_tag} 生成深度教程...", "info")
-                tutorial = self.content.generate_tutorial(project, readme, visual_summary)
-                
-                # Update DB
-                self.db.update_project_tutorial(project['id'], tutorial)
-                
-                analyzed_count += 1
-                self.progress["done"] += 1
-                self._notify(f"{progress_tag} ✅ {project['name']} 处理完成", "success")
-                
-                # 稍微延时避免请求过快
-                time.sleep(1)
+            # 边从数据库取待分析项目 (缺 120B 结果的) 边处理
+            analyzed_count = await self._analyze_projects_async(BATCH_ANALYSIS_LIMIT)
             
+            await asyncio.to_thread(self.db.flush)
             self._notify(f"🎉 批量分析完成！共处理 {analyzed_count} 个项目", "success")
             return {"status": "completed", "count": analyzed_count}
             
@@ -286,6 +316,126 @@ class MasterAgent:
             self.is_running = False
             self.current_task = None
 
+    async def _analyze_projects_async(self, max_projects: int) -> int:
+        """生产者-消费者并发处理待分析项目，返回完成数量
+
+        生产者按页从数据库补充队列，analyze_concurrency 个 worker 各自取项目处理，
+        不必等一整批全部完成才开始下一批。LLM 请求另受各模型的并发上限约束。
+        单个项目失败只记录错误，不影响其它项目。
+        """
+        workers = SCAN_CONFIG["analyze_concurrency"]
+        queue: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue(maxsize=ANALYZE_QUEUE_SIZE)
+        seen = set()
+        done = 0
+        
+        async def _producer():
+            try:
+                while self.is_running and len(seen) < max_projects:
+                    # 在途项目的结果尚未写回，仍会出现在待分析列表里；多取 len(seen) 行保证能拿到新项目
+                    batch = await asyncio.to_thread(
+                        self.db.get_projects_needing_analysis, ANALYZE_QUEUE_SIZE + len(seen)
+                    )
+                    fresh = [p for p in batch if p['id'] not in seen][:max_projects - len(seen)]
+                    if not fresh:
+                        break
+                    for project in fresh:
+                        seen.add(project['id'])
+                        self.progress["total"] += 1
+                        # 入队时就开始抓 README / 截图，worker 取到项目时通常已经就绪
+                        await queue.put((project, self._prefetch(project)))
+            finally:
+                for _ in range(workers):
+                    await queue.put(None)
+        
+        async def _worker():
+            nonlocal done
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                project, prefetch = item
+                if not self.is_running:
+                    for task in prefetch.values():
+                        task.cancel()
+                    continue
+                try:
+                    await self._analyze_one_async(project, f"[{self.progress['done'] + 1}/{self.progress['total']}]", prefetch)
+                    done += 1
+                except Exception as e:
+                    self._notify(f"❌ {project['name']} 处理失败: {e}", "error")
+        
+        await asyncio.gather(_producer(), *(_worker() for _ in range(workers)))
+        return done
+    
+    def _prefetch(self, project: Dict) -> Dict[str, asyncio.Task]:
+        """后台开始抓取项目的 README 和 (缺失时的) 截图"""
+        tasks = {"readme": asyncio.create_task(asyncio.to_thread(self.crawler.get_readme, project['full_name']))}
+        if not project.get('screenshot'):
+            # 截图在爬虫的截图进程池中执行，通过 wrap_future 等待结果，不占用线程池
+            tasks["screenshot"] = asyncio.create_task(
+                self.crawler.capture_screenshot_async(project['url'], project['id'])
+            )
+        return tasks
+    
+    async def _analyze_one_async(self, project: Dict, progress_tag: str,
+                                 prefetch: Optional[Dict[str, asyncio.Task]] = None):
+        """单个项目：README → 分析 / RAG 摘要 → 截图 → 视觉分析 → 教程，最后一次写入"""
+        self.progress["current"] = f"Analyzing: {project['name']}"
+        self._notify(f"{progress_tag} 正在分析 {project['name']}...", "info")
+        if prefetch is None:
+            prefetch = self._prefetch(project)
+        
+        # 始终获取 README (分析需要)
+        readme = await prefetch["readme"]
+        
+        # 1. 生成 AI Analysis (如果不是 120B 生成的或还没生成)
+        is_120b = project.get('ai_model_name') and '120b' in project['ai_model_name'].lower()
+        
+        # 各步骤结果汇总后一次写入数据库
+        updates = {}
+        new_analysis = None
+        
+        analysis_task = None
+        if not is_120b:
+            analysis_task = asyncio.create_task(self.analyzer.analyze_project_async(project, readme))
+        
+        # 1.1 生成 RAG Summary (如果缺失)，与上面的分析同时请求
+        if not project.get('ai_rag_summary') or not is_120b:
+            rag_summary = await self.analyzer.generate_rag_summary_async(project, readme)
+            if rag_summary:
+                updates["ai_rag_summary"] = rag_summary
+        if analysis_task:
+            new_analysis = await analysis_task
+        
+        # 2. 抓取截图 (如果缺失)
+        screenshot_path = project.get('screenshot')
+        if not screenshot_path:
+            self._notify(f"{progress_tag} 正在截图 {project['name']}...", "info")
+            screenshot_path = await prefetch["screenshot"]
+            if screenshot_path:
+                updates["screenshot"] = screenshot_path
+        
+        # 3. 视觉分析 (OCR & UI)
+        visual_summary = ""
+        if screenshot_path:
+            self._notify(f"{progress_tag} 视觉分析 (OCR) {project['name']}...", "info")
+            visual_summary = await self.analyzer.analyze_with_vision_async(project, screenshot_path)
+            # 视觉摘要也需要更新
+            updates["ai_visual_summary"] = visual_summary
+        
+        # 4. 生成深度教程
+        self._notify(f"{progress_tag} 生成深度教程...", "info")
+        updates["ai_tutorial"] = await self.content.generate_tutorial_async(project, readme, visual_summary)
+        
+        # Update DB (一个项目一次写入，由后台线程批量提交)
+        if new_analysis:
+            self.db.update_project_analysis(project['id'], new_analysis, **updates)
+        else:
+            self.db.update_project_fields(project['id'], **updates)
+        
+        self.progress["done"] += 1
+        self._notify(f"{progress_tag} ✅ {project['name']} 处理完成", "success")
+
     def run_category_scan(self, category: str) -> Dict:
         """扫描单个分类"""
         if category not in CATEGORIES:
@@ -301,8 +451,7 @@ class MasterAgent:
         else:
             projects = self.crawler.search_by_keywords(cat_config["keywords"], category)
         
-        for project in projects:
-            self.db.upsert_project(project)
+        self.db.upsert_projects(projects)
         
         self._notify(f"Found {len(projects)} projects", "success")
         return {"category": category, "count": len(projects)}
@@ -317,24 +466,30 @@ class MasterAgent:
             self._notify("Starting News Discovery Scan...", "info")
             total_found = 0
             
+            # 各来源并发抓取 (同一站点的请求由爬虫按域名限流)，按原顺序处理结果
             for url in DISCOVERY_URLS:
                 self._notify(f"Crawling source: {url}...", "info")
-                projects = self.crawler.crawl_external_page(url)
-                
+            with ThreadPoolExecutor(max_workers=SCAN_CONFIG["crawl_concurrency"]) as pool:
+                crawled = list(pool.map(self.crawler.crawl_external_page, DISCOVERY_URLS))
+            
+            for url, projects in zip(DISCOVERY_URLS, crawled):
                 # Assign to 'news' category if generic, or try to auto-classify later?
                 # For now let's put them in 'news' category or 'manual'
                 # The user asked for "continuous discovery", so maybe a 'news' category is best.
                 # But our frontend needs to support 'news' category ID if we use it.
                 # Let's check config.py... yes, 'news' category exists!
                 
-                source_count = 0
+                # 如果库里没有，才算新发现 (一次查询判断哪些已存在，新项目一次批量写入)
+                known = self.db.existing_ids([p['id'] for p in projects])
+                new_projects = []
                 for p in projects:
-                    # 如果库里没有，才算新发现
-                    if not self.db.get_project(p['id']):
+                    if str(p['id']) not in known:
+                        known.add(str(p['id']))
                         p['category'] = 'news' # Force category
-                        self.db.upsert_project(p)
-                        source_count += 1
+                        new_projects.append(p)
                         self._notify(f"Found new project: {p['name']}", "success")
+                self.db.upsert_projects(new_projects)
+                source_count = len(new_projects)
                 
                 results["sources"][url] = source_count
                 total_found += source_count
@@ -359,10 +514,11 @@ class MasterAgent:
             return {"error": "Failed to fetch project. Check URL or network."}
         
         self.db.upsert_project(project)
+        self._clear_search_cache()
         self._notify(f"Added {project['name']}. Starting analysis...", "success")
         
-        # 立即分析
-        threading.Thread(target=self.analyze_single, args=(project['id'],)).start()
+        # 立即分析 (与扫描共用后台线程池，不另起线程)
+        self.background.submit(self.analyze_single, project['id'], project)
         
         return {"status": "added", "project": project['name']}
 
@@ -370,60 +526,80 @@ class MasterAgent:
         """重置所有数据"""
         try:
             self.db.clear_database()
+            self._clear_search_cache()
             self._notify("Database cleared. All project data removed.", "warning")
             return {"status": "success", "message": "Database reset successfully"}
         except Exception as e:
             return {"error": str(e)}
 
-    def analyze_single(self, project_id: str) -> Dict:
-        """分析单个项目"""
-        cursor = self.db.conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        )
-        row = cursor.fetchone()
-        if not row:
+    def analyze_single(self, project_id: str, project: Optional[Dict] = None) -> Dict:
+        """分析单个项目 (已取到的 project 可直接传入，省去一次查询)"""
+        if project is None:
+            project = self._load_project(project_id)
+        if not project:
             return {"error": "Project not found"}
         
-        project = dict(row)
-        
         # 抓取截图
         if not project.get('screenshot'):
             screenshot_path = self.crawler.capture_screenshot(project['url'], project_id)
             if screenshot_path:
-                self.db.update_screenshot(project_id, screenshot_path)
+                self.db.update_project_screenshot(project_id, screenshot_path)
         
         readme = self.crawler.get_readme(project['full_name'])
         analysis = self.analyzer.analyze_project(project, readme)
-        self.db.update_ai_analysis(project_id, analysis)
         
-        # Generate RAG Summary
+        # Generate RAG Summary，与分析结果一起写入
         rag_summary = self.analyzer.generate_rag_summary(project, readme)
-        self.db.conn.execute("UPDATE projects SET ai_rag_summary = ? WHERE id = ?", (rag_summary, project_id))
-        self.db.conn.commit()
+        self.db.update_project_analysis(project_id, analysis, ai_rag_summary=rag_summary)
         
         return analysis
     
-    def generate_tutorial(self, project_id: str) -> str:
-        """生成项目教程"""
-        cursor = self.db.conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        )
-        row = cursor.fetchone()
-        if not row:
+    def generate_tutorial(self, project_id: str, project: Optional[Dict] = None) -> str:
+        """生成项目教程 (已取到的 project 可直接传入，省去一次查询)"""
+        if project is None:
+            project = self._load_project(project_id)
+        if not project:
             return "Project not found"
         
-        project = dict(row)
         readme = self.crawler.get_readme(project['full_name'])
         tutorial = self.content.generate_tutorial(project, readme)
         
         # 保存教程
-        self.db.conn.execute(
-            "UPDATE projects SET ai_tutorial = ? WHERE id = ?",
-            (tutorial, project_id)
-        )
-        self.db.conn.commit()
+        self.db.update_project_tutorial(project_id, tutorial)
         
         # 同时保存为 Markdown 文件
+        self._save_tutorial_file(project, tutorial)
+        
+        return tutorial
+    
+    def _load_project(self, project_id: str) -> Optional[Dict]:
+        """只取分析 / 教程需要的列 (不含 ai_tutorial 等大字段)"""
+        rows = self.db.get_by_ids([project_id])
+        return rows[0] if rows else None
+    
+    def generate_tutorial_stream(self, project_id: str) -> Iterator[str]:
+        """流式生成项目教程，生成完毕后写入数据库"""
+        project = self.db.get_project(project_id)
+        if not project:
+            yield "Project not found"
+            return
+        
+        if project.get('ai_tutorial'):
+            yield project['ai_tutorial']
+            return
+        
+        readme = self.crawler.get_readme(project['full_name'])
+        chunks = []
+        for chunk in iter_sync(self.content.generate_tutorial_stream(project, readme)):
+            chunks.append(chunk)
+            yield chunk
+        
+        tutorial = "".join(chunks)
+        self.db.update_project_tutorial(project_id, tutorial)
+        self._save_tutorial_file(project, tutorial)
+    
+    def _save_tutorial_file(self, project: Dict, tutorial: str):
+        """教程另存为 Markdown 文件"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d")
             filename = f"data/tutorials/{project['name']}_{timestamp}.md"
@@ -433,8 +609,6 @@ class MasterAgent:
                 f.write(tutorial)
         except:
             pass
-        
-        return tutorial
     
     def get_status(self) -> Dict:
         """获取当前状态"""
@@ -446,34 +620,74 @@ class MasterAgent:
         }
     
     
+    def _cache_put(self, cache: dict, key, value, ttl: float):
+        """写入带过期时间的缓存，超出容量时淘汰最早写入的条目"""
+        with self._search_lock:
+            cache.pop(key, None)
+            cache[key] = (value, time.monotonic() + ttl)
+            if len(cache) > SEARCH_CACHE_SIZE:
+                del cache[next(iter(cache))]
+
+    def _cache_get(self, cache: dict, key):
+        with self._search_lock:
+            entry = cache.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0], True
+        return None, False
+
+    def _clear_search_cache(self):
+        with self._search_lock:
+            self._search_cache.clear()
+
     def search_hybrid(self, query: str, limit: int = 20) -> Dict:
-        """混合搜索：本地 DB + GitHub 实时搜索"""
-        results = {"local": [], "remote": []}
+        """混合搜索：本地 DB + GitHub 实时搜索 (相同查询 60 秒内直接返回缓存)"""
+        return run_sync(self.search_hybrid_async(query, limit))
+    
+    async def search_hybrid_async(self, query: str, limit: int = 20) -> Dict:
+        """search_hybrid 的协程版本：本地搜索和 GitHub 搜索同时进行，耗时取两者中较长的一个"""
+        key = (query.strip().lower(), limit)
+        cached, hit = self._cache_get(self._search_cache, key)
+        if hit:
+            return cached
+        
+        # 最近在 GitHub 上搜过且没有结果的查询，不再重复请求
+        remote_task = None
+        if not self._cache_get(self._remote_misses, key[0])[1]:
+            # GitHub 搜索是阻塞操作 (约 1-2s)，放到线程里与本地搜索并行
+            remote_task = asyncio.ensure_future(asyncio.to_thread(self.crawler.search_remote, query, 10))
         
         # 1. 本地搜索
-        local_results = self.db.search_projects(query, limit=limit)
-        results["local"] = local_results
-        
-        # 2. 如果本地结果很少，或者强制混合，则搜索 GitHub
-        # 策略：本地不足 5 个，或者用户显式要求此功能
-        if len(local_results) < 5:
-            # 启动 GitHub 搜索 (注意这是一个阻塞操作，耗时约 1-2s)
-            remote_results = self.crawler.search_remote(query, limit=10)
+        local_results = await asyncio.to_thread(self.db.search_projects, query, limit)
+        results = {"local": local_results, "remote": []}
+        
+        # 2. 本地结果不足 5 个时才使用 GitHub 结果；否则不再等待远程搜索
+        if remote_task is not None and len(local_results) < 5:
+            remote_results = await remote_task
+            if not remote_results:
+                self._cache_put(self._remote_misses, key[0], True, REMOTE_MISS_TTL)
             
             # 去重：过滤掉已经在本地结果中的项目
             local_ids = {str(p['id']) for p in local_results}
             for p in remote_results:
                 if str(p['id']) not in local_ids:
                     results["remote"].append(p)
-                    
+        elif remote_task is not None:
+            remote_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        
+        self._cache_put(self._search_cache, key, results, SEARCH_CACHE_TTL)
         return results
 
     def close(self):
         self.db.close()
 
 
-def run_scheduled_scan(master: MasterAgent):
-    """定时扫描任务 (后台线程)"""
+def start_scheduled_scan(master: MasterAgent):
+    """在后台事件循环上启动定时扫描任务"""
+    return asyncio.run_coroutine_threadsafe(scheduled_scan_loop(master), get_loop())
+
+
+async def scheduled_scan_loop(master: MasterAgent):
+    """定时扫描任务：每 30 秒检查一次是否到达设定时间"""
     print("[Scheduler] Scheduler started.")
     
     last_run_date = None
@@ -482,7 +696,7 @@ def run_scheduled_scan(master: MasterAgent):
         try:
             now = datetime.now()
             # 获取设置的时间，默认 02:00
-            scan_time_str = master.db.get_setting("scan_time", "02:00")
+            scan_time_str = await asyncio.to_thread(master.db.get_setting, "scan_time", "02:00")
             try:
                 target_hour, target_minute = map(int, scan_time_str.split(':'))
             except:
@@ -493,11 +707,11 @@ def run_scheduled_scan(master: MasterAgent):
                 today_str = now.strftime("%Y-%m-%d")
                 if last_run_date != today_str:
                     print(f"[Scheduler] Starting scheduled scan at {scan_time_str}...")
-                    master.run_full_scan()
+                    await asyncio.to_thread(master.run_full_scan)
                     last_run_date = today_str
-                    time.sleep(65) # 避免这一分钟内重复触发
+                    await asyncio.sleep(65) # 避免这一分钟内重复触发
             
-            time.sleep(30)
+            await asyncio.sleep(30)
         except Exception as e:
             print(f"[Scheduler] Error: {e}")
-            time.sleep(60)
+            await asyncio.sleep(60)
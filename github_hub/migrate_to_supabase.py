@@ -6,6 +6,7 @@ import sqlite3
 import json
 import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -13,6 +14,30 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from supabase import create_client
 from config import SUPABASE_URL, SUPABASE_KEY, DATABASE_PATH
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+BATCH_SIZE = 500   # rows per upsert request
+CONCURRENCY = 8    # upsert requests in flight
+JSON_FIELDS = ('topics', 'ai_tech_stack', 'ai_use_cases')
+
+
+def _project_row(row) -> dict:
+    """SQLite row -> Supabase row: JSON text columns parsed, id as string"""
+    data = dict(row)
+    for field in JSON_FIELDS:
+        value = data.get(field)
+        try:
+            data[field] = _loads(value) if value else []
+        except ValueError:
+            data[field] = []
+    data['id'] = str(data['id'])
+    return data
+
+
 def migrate():
     # Connect to local SQLite
     base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -34,29 +59,33 @@ def migrate():
     # Migrate Projects
     print("\n--- Migrating Projects ---")
     cursor.execute("SELECT * FROM projects")
-    projects = cursor.fetchall()
-    print(f"Found {len(projects)} projects")
     
-    for row in projects:
-        data = dict(row)
-        # Parse JSON fields
-        for field in ['topics', 'ai_tech_stack', 'ai_use_cases']:
-            if data.get(field):
-                try:
-                    data[field] = json.loads(data[field])
-                except:
-                    data[field] = []
-            else:
-                data[field] = []
-        
-        # Convert id to string
-        data['id'] = str(data['id'])
-        
-        try:
-            supabase.table("projects").upsert(data).execute()
-            print(f"  Migrated: {data['name']}")
-        except Exception as e:
-            print(f"  Error migrating {data['name']}: {e}")
+    def push(chunk):
+        supabase.table("projects").upsert(chunk, on_conflict="id").execute()
+        return len(chunk)
+    
+    def report(done):
+        for future in done:
+            chunk = in_flight.pop(future)
+            try:
+                print(f"  Migrated {future.result()} projects ({chunk[0]['name']} ...)")
+            except Exception as e:
+                print(f"  Error migrating batch starting at {chunk[0]['name']}: {e}")
+    
+    # Stream BATCH_SIZE rows at a time from SQLite, one upsert request per batch;
+    # only the batches in flight are held in memory
+    total = 0
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            chunk = [_project_row(row) for row in rows]
+            total += len(chunk)
+            in_flight[pool.submit(push, chunk)] = chunk
+            if len(in_flight) >= CONCURRENCY:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                report(done)
+        report(list(in_flight))
+    print(f"Processed {total} projects")
     
     # Migrate News Sources
     print("\n--- Migrating News Sources ---")
@@ -0,0 +1,74 @@
+# GitHub Hub - 令牌桶限流 (线程与协程共用)
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """令牌桶：平均速率 rate 个/秒，最多积攒 capacity 个
+
+    采用预留模式：取令牌时立即扣减 (允许透支)，调用方按透支量等待相应时间，
+    因此同步线程和异步协程可以共享同一个桶，且等待期间不持有锁。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """预留令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1):
+        """阻塞直到拿到令牌"""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1):
+        """异步等待直到拿到令牌"""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class DomainRateLimiter:
+    """按域名限流：同一 host 的相邻请求至少间隔 delay 秒，不同 host 互不影响
+
+    与 TokenBucket 一样采用预留模式，等待期间不持有锁，线程与协程可共用。
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._next_ok = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, host: str) -> float:
+        """预留该 host 的下一个请求时间点，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            due = max(now, self._next_ok.get(host, 0.0))
+            self._next_ok[host] = due + self.delay
+            return due - now
+
+    def wait(self, host: str):
+        """阻塞直到可以向 host 发请求"""
+        delay = self._reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, host: str):
+        """异步等待直到可以向 host 发请求"""
+        delay = self._reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,110 @@
+# GitHub Hub - API 响应缓存 (Redis / 进程内，短 TTL)
+import fnmatch
+import functools
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .config import REDIS_URL
+
+KEY_PREFIX = "github_hub:resp:"
+MEMORY_MAXSIZE = 512
+
+
+def _dump_json(obj) -> bytes:
+    """序列化为 UTF-8 JSON 字节：有 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+class ResponseCache:
+    """缓存 GET 接口序列化后的 JSON
+
+    配置了 REDIS_URL 且安装了 redis 时使用 Redis (多个进程共享)，否则使用进程内字典。
+    """
+
+    def __init__(self, redis_url: Optional[str] = REDIS_URL):
+        self._memory: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis and redis_url:
+            try:
+                self._redis = redis.Redis.from_url(redis_url)
+            except Exception as e:
+                print(f"Warning: Could not connect to Redis at {redis_url}: {e}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self._redis is not None:
+            try:
+                return self._redis.get(KEY_PREFIX + key)
+            except Exception as e:
+                print(f"[ResponseCache] Redis read failed: {e}")
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def set(self, key: str, body: bytes, ttl: int):
+        if self._redis is not None:
+            try:
+                self._redis.setex(KEY_PREFIX + key, ttl, body)
+                return
+            except Exception as e:
+                print(f"[ResponseCache] Redis write failed: {e}")
+        with self._lock:
+            self._memory.pop(key, None)
+            self._memory[key] = (body, time.monotonic() + ttl)
+            if len(self._memory) > MEMORY_MAXSIZE:
+                # 最早写入的先淘汰 (字典保持插入顺序)
+                del self._memory[next(iter(self._memory))]
+
+    def invalidate(self, *patterns: str):
+        """按 key 或 glob 模式 (如 "cat:*") 删除缓存"""
+        if self._redis is not None:
+            try:
+                for pattern in patterns:
+                    if any(c in pattern for c in "*?["):
+                        keys = list(self._redis.scan_iter(match=KEY_PREFIX + pattern, count=500))
+                    else:
+                        keys = [KEY_PREFIX + pattern]
+                    if keys:
+                        self._redis.delete(*keys)
+                return
+            except Exception as e:
+                print(f"[ResponseCache] Redis delete failed: {e}")
+        with self._lock:
+            for key in [k for k in self._memory if any(fnmatch.fnmatchcase(k, p) for p in patterns)]:
+                del self._memory[key]
+
+    def cached(self, ttl: int, key: Callable[..., str], response_class: Callable[[bytes], object]):
+        """缓存异步处理函数的结果：key 接收与处理函数相同的参数，命中时直接返回已序列化的 JSON
+
+        处理函数返回的 Response 对象 (如错误响应) 不缓存。
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                cache_key = key(*args, **kwargs)
+                body = self.get(cache_key)
+                if body is None:
+                    result = await func(*args, **kwargs)
+                    if not isinstance(result, (dict, list)):
+                        return result
+                    body = _dump_json(result)
+                    self.set(cache_key, body, ttl)
+                return response_class(body)
+            return wrapper
+        return decorator
@@ -0,0 +1,24 @@
+# GitHub Hub - 定时任务进程 (多 worker 部署时单独运行)
+#
+# Web 进程以 RUN_SCHEDULER=0 启动 (如 RUN_SCHEDULER=0 uvicorn github_hub.server:app --workers 4)，
+# 自动分析和每日扫描只在这个进程里运行一份：
+#   python -m github_hub.scheduler
+import threading
+
+from .master import MasterAgent, start_scheduled_scan
+
+
+def main():
+    master = MasterAgent(run_scheduler=True)
+    start_scheduled_scan(master)
+    print("[Scheduler] Running auto-analysis and scheduled scans. Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        master.close()
+
+
+if __name__ == "__main__":
+    main()
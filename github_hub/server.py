@@ -1,407 +1,637 @@
-# GitHub Hub - Flask Web Server
-from flask import Flask, jsonify, request, send_from_directory, Response
-from flask_cors import CORS
+# GitHub Hub - FastAPI Web Server (ASGI)
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
+import asyncio
+import functools
 import json
-import queue
-import threading
+import os
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from .aio import get_loop, iter_on_loop, run_on_loop
 from .master import MasterAgent
-from .config import CATEGORIES
+from .response_cache import ResponseCache
+from .conditional_get import ConditionalGetMiddleware, etag_for
+from .config import CATEGORIES, RUN_SCHEDULER
 
-app = Flask(__name__, static_folder='static')
-CORS(app)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# 全局 Master Agent
-master = MasterAgent()
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# SSE 日志队列
-log_queue = queue.Queue()
+# 有 orjson 时所有 JSON 响应都用 orjson 序列化
+JSON_RESPONSE = ORJSONResponse if orjson is not None else JSONResponse
 
-def log_callback(data):
-    """日志回调，推送到 SSE 队列"""
-    log_queue.put(data)
+# 仪表盘轮询的接口：内容没变时返回 304
+ETAG_PATHS = ("/api/status", "/api/progress", "/api/pending", "/api/stats", "/api/dashboard")
 
-master.add_callback(log_callback)
+app = FastAPI(title="GitHub Hub", default_response_class=JSON_RESPONSE)
+# 后添加的中间件在外层：CORS 包在外面，304 响应也会带上 CORS 头
+app.add_middleware(ConditionalGetMiddleware, paths=ETAG_PATHS)
+# 压缩 1KB 以上的响应 (ETag 按未压缩内容计算)；text/event-stream 不压缩，每条事件立即发出
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static"), check_dir=False), name="static")
 
+# 主页也交给 StaticFiles：带 ETag / Last-Modified，未修改时返回 304；只会读取 dashboard.html 这一个文件
+dashboard_files = StaticFiles(directory=BASE_DIR)
 
-@app.route('/')
-def index():
+# 全局 Master Agent (截图子进程以 __mp_main__ 重新执行本模块时不创建，见 CrawlerAgent._get_screenshot_pool)
+master = MasterAgent() if __name__ != "__mp_main__" else None
+
+# SSE 心跳间隔 (秒)
+LOG_PING_INTERVAL = 30
+
+# 仪表盘轮询接口的响应缓存 (秒)
+RESPONSE_TTL = 5
+
+response_cache = ResponseCache()
+
+# 导出文件名，以及流式导出时每次发送的行数
+EXPORT_FILENAME = "github_projects_export.json"
+EXPORT_CHUNK_ROWS = 500
+
+# 写操作之后需要失效的缓存
+PROJECT_CACHE_KEYS = ("stats", "pending", "status", "dashboard", "cat:*")
+
+# 处理函数都是协程：同步的数据库 / 爬虫调用用 asyncio.to_thread 放到线程池，
+# LLM 调用直接等待后台事件循环上的异步版本 (run_on_loop)，不占用服务器的事件循环
+
+
+def _error(message: str, status_code: int) -> Response:
+    return JSON_RESPONSE({"error": message}, status_code=status_code)
+
+
+def _dumps(obj) -> bytes:
+    """序列化为 UTF-8 JSON 字节：有 orjson 时使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+# SSE 响应头：禁止反向代理缓冲，事件逐条送达
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+# 分类配置是常量：启动时序列化一次
+CATEGORIES_BYTES = _dumps(CATEGORIES)
+CATEGORIES_ETAG = etag_for(CATEGORIES_BYTES)
+
+
+def _sse(data) -> bytes:
+    """编码一条 SSE 消息"""
+    return b"data: " + _dumps(data) + b"\n\n"
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def cached(key):
+    """缓存 GET 接口的 JSON 响应 RESPONSE_TTL 秒"""
+    return response_cache.cached(RESPONSE_TTL, key, _json_response)
+
+
+# 后台任务登记表 (只含运行中的任务)：job_id -> (任务名, Future)，任务名 -> job_id。
+# 结束后的状态写入 response_cache (配置了 Redis 时跨进程、跨重启可查)
+JOB_TTL = 3600
+jobs: Dict[str, Tuple[str, Future]] = {}
+running_jobs: Dict[str, str] = {}
+
+
+def _job_state(job_id: str, name: str, future: Future) -> dict:
+    """由 Future 得出任务状态"""
+    state = {"job_id": job_id, "name": name, "done": future.done()}
+    if not future.done():
+        state["status"] = "running"
+    elif future.cancelled():
+        state["status"] = "cancelled"
+    elif future.exception() is not None:
+        state.update(status="failed", error=str(future.exception()))
+    else:
+        result = future.result()
+        failed = isinstance(result, dict) and "error" in result
+        state.update(status="failed" if failed else "done", result=result)
+    return state
+
+
+def _job_done(job_id: str, name: str, future: Future):
+    """后台任务结束：失效项目相关缓存，保存最终状态，并把异常推送到日志
+
+    结束的任务总会从 jobs / running_jobs 中移除，两张表里只有正在运行的任务。
+    """
+    try:
+        response_cache.invalidate(*PROJECT_CACHE_KEYS)
+        state = _job_state(job_id, name, future)
+        try:
+            body = _dumps(state)
+        except TypeError:
+            state["result"] = str(state.get("result"))
+            body = _dumps(state)
+        response_cache.set(f"job:{job_id}", body, JOB_TTL)
+        if state["status"] == "failed" and "error" in state:
+            master._notify(f"Background task failed: {state['error']}", "error")
+    finally:
+        jobs.pop(job_id, None)
+        if running_jobs.get(name) == job_id:
+            del running_jobs[name]
+
+
+def _start_job(name: str, start) -> Optional[str]:
+    """启动后台任务 (start() 返回 Future) 并返回 job_id；同名任务仍在运行时返回 None"""
+    current = jobs.get(running_jobs.get(name, ""))
+    if current is not None and not current[1].done():
+        return None
+    job_id = uuid.uuid4().hex
+    future = start()
+    jobs[job_id] = (name, future)
+    running_jobs[name] = job_id
+    future.add_done_callback(functools.partial(_job_done, job_id, name))
+    return job_id
+
+
+def _submit_job(name: str, target, *args) -> Optional[str]:
+    """在后台线程池中运行同步任务"""
+    return _start_job(name, lambda: master.background.submit(target, *args))
+
+
+def _schedule_job(name: str, coro_factory) -> Optional[str]:
+    """在后台事件循环上运行协程任务，不占用线程池"""
+    return _start_job(name, lambda: asyncio.run_coroutine_threadsafe(coro_factory(), get_loop()))
+
+
+def _accepted(job_id: str, **extra) -> Response:
+    """202：任务已受理，通过 /api/jobs/{job_id} 查询结果"""
+    return JSON_RESPONSE({"status": "started", "job_id": job_id, **extra}, status_code=202)
+
+
+@app.get('/api/jobs/{job_id}')
+async def get_job(job_id: str):
+    """查询后台任务状态"""
+    entry = jobs.get(job_id)
+    if entry is not None:
+        return _job_state(job_id, *entry)
+    body = response_cache.get(f"job:{job_id}")
+    if body is None:
+        return _error("Job not found", 404)
+    return _json_response(body)
+
+
+# ========== 请求体 (由 FastAPI 一次解析并校验) ==========
+
+class SettingsBody(BaseModel):
+    scan_time: Optional[str] = None
+
+
+class SearchBody(BaseModel):
+    query: str = ''
+    skip_ai: bool = False
+
+
+class RefineBody(BaseModel):
+    history: List[Dict[str, Any]] = []
+
+
+class QueryBody(BaseModel):
+    query: str = ''
+    limit: Optional[int] = None
+
+
+class RecommendBody(BaseModel):
+    query: str = ''
+    projects: List[Dict[str, Any]] = []
+
+
+class UrlBody(BaseModel):
+    url: str = ''
+
+
+class NewsSourceBody(BaseModel):
+    name: str = 'Untitled Source'
+    url: str = ''
+
+
+@app.get('/')
+async def index(request: Request):
     """主页"""
-    import os
-    # Use absolute path resolution
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    return send_from_directory(base_dir, 'dashboard.html')
+    response = await dashboard_files.get_response('dashboard.html', request.scope)
+    # 允许浏览器缓存，但每次都先用 ETag 确认是否有更新
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
-@app.route('/api/categories')
-def get_categories():
+@app.get('/api/categories')
+async def get_categories(request: Request):
     """获取所有分类配置"""
-    return jsonify(CATEGORIES)
+    headers = {"ETag": CATEGORIES_ETAG, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == CATEGORIES_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(CATEGORIES_BYTES, media_type="application/json", headers=headers)
 
 
-@app.route('/api/projects/<category>')
-def get_projects(category):
+@app.get('/api/projects/{category}')
+@cached(lambda category, limit=100: f"cat:{category}:{limit}")
+async def get_projects(category: str, limit: int = 100):
     """获取某分类的项目列表"""
-    limit = request.args.get('limit', 100, type=int)
-    projects = master.db.get_projects_by_category(category, limit)
-    
     # Supabase JSONB fields are already Python objects, no parsing needed
-    return jsonify(projects)
-
-@app.route('/api/export')
-def export_data():
-    """导出所有数据到 JSON"""
-    try:
-        projects = master.db.get_all_projects()
-        
-        # 解析 JSON 字段
-        for p in projects:
-            for field in ['topics', 'ai_tech_stack', 'ai_use_cases']:
-                if p.get(field):
-                    try:
-                        p[field] = json.loads(p[field])
-                    except:
-                        p[field] = []
-        
-        # 保存到文件
-        export_path = "github_projects_export.json"
-        with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, ensure_ascii=False, indent=2)
-            
-        return jsonify({
-            "status": "success", 
-            "message": f"已导出 {len(projects)} 个项目到 {export_path}",
-            "path": export_path,
-            "count": len(projects)
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
+    return await asyncio.to_thread(master.db.get_projects_by_category, category, limit)
 
-@app.route('/api/project/<project_id>')
-def get_project(project_id):
+@app.get('/api/export')
+async def export_data():
+    """导出所有数据为 JSON 文件 (按页读取、边读边发送，不在内存中保留整个数据集)"""
+    def generate():
+        yield b'[\n'
+        parts = []
+        count = 0
+        for project in master.db.iter_all_projects(columns="*"):
+            parts.append((b',\n' if count else b'') + _dumps(project))
+            count += 1
+            # 攒够一批再发送，避免每行都切换一次线程池
+            if len(parts) >= EXPORT_CHUNK_ROWS:
+                yield b''.join(parts)
+                parts.clear()
+        yield b''.join(parts) + b'\n]'
+
+    return StreamingResponse(
+        generate(),
+        media_type='application/json',
+        headers={"Content-Disposition": f'attachment; filename="{EXPORT_FILENAME}"'},
+    )
+
+
+@app.get('/api/project/{project_id}')
+async def get_project(project_id: str):
     """获取单个项目详情"""
-    project = master.db.get_project(project_id)
+    project = await asyncio.to_thread(master.db.get_project, project_id)
     if not project:
-        return jsonify({"error": "Not found"}), 404
-    # 解析 JSON 字段
-    for field in ['topics', 'ai_tech_stack', 'ai_use_cases']:
-        if project.get(field):
-            try:
-                project[field] = json.loads(project[field])
-            except:
-                project[field] = []
-    
-    return jsonify(project)
-
-
-@app.route('/api/scan', methods=['POST'])
-def start_scan():
+        return _error("Not found", 404)
+    # Supabase JSONB fields are already Python objects, no parsing needed
+    return project
+
+
+@app.post('/api/scan')
+async def start_scan():
     """启动完整扫描"""
     if master.is_running:
-        return jsonify({"error": "Scan already running"}), 400
-    
-    # 在后台线程运行
-    thread = threading.Thread(target=master.run_full_scan)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"status": "started"})
-
-@app.route('/api/stop', methods=['POST'])
-def stop_process():
+        return _error("Scan already running", 400)
+
+    # 在后台线程池运行
+    job_id = _submit_job("scan", master.run_full_scan)
+    if job_id is None:
+        return _error("Scan already running", 400)
+
+    return _accepted(job_id)
+
+@app.post('/api/stop')
+async def stop_process():
     """停止当前任务"""
-    result = master.stop_task()
-    return jsonify(result)
+    return master.stop_task()
 
 
-@app.route('/api/scan/<category>', methods=['POST'])
-def scan_category(category):
+# 必须注册在 /api/scan/{category} 之前，否则 news 会被当成分类名
+@app.post('/api/scan/news')
+async def scan_news():
+    """手动触发新闻源扫描"""
+    if master.is_running:
+        return _error("Scan already running", 400)
+
+    # 在后台线程池运行
+    job_id = _submit_job("news_scan", master.run_news_scan)
+    if job_id is None:
+        return _error("Scan already running", 400)
+
+    return _accepted(job_id, message="News scan started")
+
+
+@app.post('/api/scan/{category}')
+async def scan_category(category: str):
     """扫描单个分类"""
-    result = master.run_category_scan(category)
-    return jsonify(result)
+    job_id = _submit_job(f"scan:{category}", master.run_category_scan, category)
+    if job_id is None:
+        return _error("Scan already running", 400)
+    return _accepted(job_id)
 
 
-@app.route('/api/settings', methods=['GET'])
-def get_settings():
+@app.get('/api/settings')
+@cached(lambda: "settings")
+async def get_settings():
     """获取所有设置"""
     # 目前只有 scan_time
-    scan_time = master.db.get_setting("scan_time", "02:00")
-    return jsonify({"scan_time": scan_time})
+    scan_time = await asyncio.to_thread(master.db.get_setting, "scan_time", "02:00")
+    return {"scan_time": scan_time}
 
-@app.route('/api/settings', methods=['POST'])
-def save_settings():
+@app.post('/api/settings')
+async def save_settings(body: SettingsBody):
     """保存设置"""
-    data = request.json
-    scan_time = data.get('scan_time')
+    scan_time = body.scan_time
     if scan_time:
-        master.db.set_setting("scan_time", scan_time)
-        return jsonify({"status": "saved", "scan_time": scan_time})
-    return jsonify({"error": "Invalid data"}), 400
+        await asyncio.to_thread(master.db.set_setting, "scan_time", scan_time)
+        response_cache.invalidate("settings")
+        return {"status": "saved", "scan_time": scan_time}
+    return _error("Invalid data", 400)
 
-@app.route('/api/scan/news', methods=['POST'])
-def scan_news():
-    """手动触发新闻源扫描"""
-    if master.is_running:
-        return jsonify({"error": "Scan already running"}), 400
-    
-    # 在后台线程运行
-    thread = threading.Thread(target=master.run_news_scan)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({"status": "started", "message": "News scan started"})
-
-
-@app.route('/api/analyze/<project_id>', methods=['POST'])
-def analyze_project(project_id):
+@app.post('/api/analyze/{project_id}')
+async def analyze_project(project_id: str):
     """分析单个项目"""
-    result = master.analyze_single(project_id)
-    return jsonify(result)
+    return await asyncio.to_thread(master.analyze_single, project_id)
 
 
-@app.route('/api/analyze_all', methods=['POST'])
-def analyze_all():
+@app.post('/api/analyze_all')
+async def analyze_all():
     """触发批量分析"""
-    threading.Thread(target=master.run_batch_analysis).start()
-    return jsonify({"status": "started", "message": "Batch analysis started in background"})
-
-@app.route('/api/search', methods=['POST'])
-def search_agent():
+    # 批量分析本身是有界队列 + 并发 worker 的协程流水线，直接调度到后台事件循环
+    job_id = _schedule_job("analyze_all", master.run_batch_analysis_async)
+    if job_id is None:
+        return _error("Batch analysis already running", 400)
+    return _accepted(job_id, message="Batch analysis started in background")
+
+@app.post('/api/search')
+async def search_agent(body: SearchBody):
     """智能搜索 Agent"""
-    data = request.json
-    query = data.get('query', '')
+    query = body.query
     if not query:
-        return jsonify({"error": "Query is required"}), 400
-        
+        return _error("Query is required", 400)
+
     # 1. 混合检索
     master._notify(f"🔍 Searching local database for '{query}'...", "info")
-    search_result = master.search_hybrid(query, limit=20)
+    search_result = await master.search_hybrid_async(query, 20)
     results = search_result["local"] + search_result["remote"]
-    
+
     # 2. AI 推荐 (如有结果)
     recommendation = ""
     # 如果请求 skip_ai，则跳过推荐生成
-    if not data.get('skip_ai'):
+    if not body.skip_ai:
         if results:
             master._notify(f"🧠 Found {len(results)} projects. AI Analyst is generating recommendation...", "info")
-            recommendation = master.content.recommend_solution(query, results)
+            recommendation = await run_on_loop(master.content.recommend_solution_async(query, results))
         else:
             recommendation = "抱歉，数据库中暂时没有找到匹配的项目。建议尝试其他关键词，或先进行更多类别的扫描。"
     else:
         master._notify(f"✅ Fast search completed! Found {len(results)} projects.", "success")
-        
+
     master._notify("✅ Search completed!", "success")
-    return jsonify({
+    return {
         "results": results,
         "recommendation": recommendation
-    })
+    }
 
-@app.route('/api/agent/refine', methods=['POST'])
-def refine_agent():
+@app.post('/api/agent/refine')
+async def refine_agent(body: RefineBody):
     """对话式搜索意图优化"""
-    data = request.json
-    history = data.get('history', [])
-    
+    history = body.history
+
     # 使用 Analyzer 的 refinement 逻辑
-    result = master.analyzer.refine_search_intent(history)
-    return jsonify(result)
+    return await run_on_loop(master.analyzer.refine_search_intent_async(history))
 
-@app.route('/api/search/local', methods=['POST'])
-def search_local():
+@app.post('/api/search/local')
+async def search_local(body: QueryBody):
     """快速本地搜索"""
-    data = request.json
-    query = data.get('query', '')
-    limit = data.get('limit', 20)
-    
-    results = master.db.search_projects(query, limit=limit)
-    return jsonify({"results": results})
-
-@app.route('/api/search/remote', methods=['POST'])
-def search_remote():
+    query = body.query
+    limit = body.limit or 20
+
+    results = await asyncio.to_thread(master.db.search_projects, query, limit)
+    return {"results": results}
+
+@app.post('/api/search/remote')
+async def search_remote(body: QueryBody):
     """GitHub 远程搜索 (较慢)"""
-    data = request.json
-    query = data.get('query', '')
-    limit = data.get('limit', 10)
-    
-    results = master.crawler.search_remote(query, limit=limit)
-    return jsonify({"results": results})
-
-@app.route('/api/search/recommend', methods=['POST'])
-def recommend_agent():
+    query = body.query
+    limit = body.limit or 10
+
+    results = await asyncio.to_thread(master.crawler.search_remote, query, limit)
+    return {"results": results}
+
+@app.post('/api/search/recommend')
+async def recommend_agent(body: RecommendBody):
     """单独生成 AI 推荐"""
-    data = request.json
-    query = data.get('query', '')
-    projects = data.get('projects', [])
-    
+    query = body.query
+    projects = body.projects
+
     if not query or not projects:
-        return jsonify({"error": "Query and projects are required"}), 400
-        
+        return _error("Query and projects are required", 400)
+
     master._notify(f"🧠 AI Analyst is analyzing {len(projects)} projects for recommendation...", "info")
-    recommendation = master.content.recommend_solution(query, projects)
+    recommendation = await run_on_loop(master.content.recommend_solution_async(query, projects))
     master._notify("✅ Recommendation generated!", "success")
-    
-    return jsonify({
+
+    return {
         "recommendation": recommendation
-    })
+    }
+
+@app.post('/api/search/recommend/stream')
+async def recommend_agent_stream(body: RecommendBody):
+    """流式生成 AI 推荐 (SSE)：模型输出逐段推送，不必等待完整回答"""
+    query = body.query
+    projects = body.projects
+
+    if not query or not projects:
+        return _error("Query and projects are required", 400)
 
-@app.route('/api/news/scan', methods=['POST'])
-def scan_news_source():
+    master._notify(f"🧠 AI Analyst is analyzing {len(projects)} projects for recommendation...", "info")
+
+    async def generate():
+        async for chunk in iter_on_loop(master.content.recommend_solution_stream(query, projects)):
+            yield _sse({'delta': chunk})
+        master._notify("✅ Recommendation generated!", "success")
+        yield _sse({'done': True})
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers=SSE_HEADERS)
+
+@app.post('/api/news/scan')
+async def scan_news_source(body: UrlBody):
     """扫描外部网页寻找 GitHub 链接"""
-    data = request.json
-    url = data.get('url', '')
+    url = body.url
     if not url:
-        return jsonify({"error": "URL is required"}), 400
-        
+        return _error("URL is required", 400)
+
     master._notify(f"🌍 Scanning news source: {url} ...", "info")
-    projects = master.crawler.crawl_external_page(url)
+    projects = await asyncio.to_thread(master.crawler.crawl_external_page, url)
     master._notify(f"✅ Found {len(projects)} potential projects.", "success")
-    
-    
-    return jsonify({"results": projects})
 
-@app.route('/api/news/sources', methods=['GET'])
-def get_news_sources():
+
+    return {"results": projects}
+
+@app.get('/api/news/sources')
+@cached(lambda: "news_sources")
+async def get_news_sources():
     """获取所有新闻源"""
-    sources = master.db.get_news_sources()
-    return jsonify({"sources": sources})
+    sources = await asyncio.to_thread(master.db.get_news_sources)
+    return {"sources": sources}
 
-@app.route('/api/news/sources/add', methods=['POST'])
-def add_news_source():
+@app.post('/api/news/sources/add')
+async def add_news_source(body: NewsSourceBody):
     """添加新闻源"""
-    data = request.json
-    name = data.get('name', 'Untitled Source')
-    url = data.get('url', '')
-    if not url: return jsonify({"error": "URL required"}), 400
-    
-    master.db.add_news_source(name, url)
-    return jsonify({"status": "added"})
-
-@app.route('/api/news/sources/delete/<int:id>', methods=['DELETE'])
-def delete_news_source(id):
+    name = body.name
+    url = body.url
+    if not url: return _error("URL required", 400)
+
+    await asyncio.to_thread(master.db.add_news_source, name, url)
+    response_cache.invalidate("news_sources")
+    return {"status": "added"}
+
+@app.delete('/api/news/sources/delete/{id}')
+async def delete_news_source(id: int):
     """删除新闻源"""
-    master.db.delete_news_source(id)
-    return jsonify({"status": "deleted"})
+    await asyncio.to_thread(master.db.delete_news_source, id)
+    response_cache.invalidate("news_sources")
+    return {"status": "deleted"}
 
-@app.route('/api/news/sources/scan/<int:id>', methods=['POST'])
-def scan_specific_news_source(id):
+@app.post('/api/news/sources/scan/{id}')
+async def scan_specific_news_source(id: int):
     """扫描特定新闻源并入库"""
     # 1. Get URL
-    sources = master.db.get_news_sources()
+    sources = await asyncio.to_thread(master.db.get_news_sources)
     target = next((s for s in sources if s['id'] == id), None)
-    if not target: return jsonify({"error": "Source not found"}), 404
-    
+    if not target: return _error("Source not found", 404)
+
     master._notify(f"🌍 Scanning source: {target['name']}...", "info")
-    
+
     # 2. Crawl
-    projects = master.crawler.crawl_external_page(target['url'])
-    
-    # 3. Filter Duplicates (Already in DB?)
-    new_items = []
-    for p in projects:
-        # Check by full_name usually, but we only have URL/Name in lightweight items
-        # crawler now returns basics.
-        # We can check if ID exists (hash of fullname)
-        if not master.db.project_exists(p['id']):
-             new_items.append(p)
-    
+    projects = await asyncio.to_thread(master.crawler.crawl_external_page, target['url'])
+
+    # 3. Filter Duplicates (Already in DB?) - one batched id lookup instead of one query per project
+    existing = await asyncio.to_thread(master.db.existing_ids, [p['id'] for p in projects])
+    new_items = [p for p in projects if str(p['id']) not in existing]
+
     # 4. Update Scan Time
-    master.db.update_news_source_scan_time(id)
-    
+    await asyncio.to_thread(master.db.update_news_source_scan_time, id)
+    response_cache.invalidate("news_sources")
+
     master._notify(f"✅ Source scanned. Found {len(new_items)} new items.", "success")
-    return jsonify({"results": new_items, "total_found": len(projects), "new_count": len(new_items)})
+    return {"results": new_items, "total_found": len(projects), "new_count": len(new_items)}
 
-@app.route('/api/project/add', methods=['POST'])
-def add_project_link():
+@app.post('/api/project/add')
+async def add_project_link(body: UrlBody):
     """手动添加项目链接"""
-    data = request.json
-    url = data.get('url', '')
+    url = body.url
     if not url:
-        return jsonify({"error": "URL is required"}), 400
-        
-    result = master.add_project_by_link(url)
-    if "error" in result:
-        return jsonify(result), 400
-    return jsonify(result)
+        return _error("URL is required", 400)
 
-@app.route('/api/reset', methods=['POST'])
-def reset_system():
+    # 抓取项目信息需要访问 GitHub，放到后台执行，结果通过 /api/jobs/{job_id} 查询
+    job_id = _submit_job(f"add:{url}", master.add_project_by_link, url)
+    if job_id is None:
+        return _error("This URL is already being added", 400)
+    return _accepted(job_id)
+
+@app.post('/api/reset')
+async def reset_system():
     """重置系统数据"""
-    result = master.reset_all_data()
+    result = await asyncio.to_thread(master.reset_all_data)
+    response_cache.invalidate(*PROJECT_CACHE_KEYS)
     if "error" in result:
-        return jsonify(result), 500
-    return jsonify(result)
+        return JSON_RESPONSE(result, status_code=500)
+    return result
 
-@app.route('/api/project/delete/<project_id>', methods=['DELETE'])
-def delete_project(project_id):
+@app.delete('/api/project/delete/{project_id}')
+async def delete_project(project_id: str):
     """删除单个项目"""
     try:
-        master.db.delete_project(project_id)
-        return jsonify({"status": "deleted", "id": project_id})
+        await asyncio.to_thread(master.db.delete_project, project_id)
+        response_cache.invalidate(*PROJECT_CACHE_KEYS)
+        return {"status": "deleted", "id": project_id}
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return _error(str(e), 500)
 
-@app.route('/api/tutorial/<project_id>')
-def get_tutorial(project_id):
+@app.get('/api/tutorial/{project_id}')
+async def get_tutorial(project_id: str):
     """获取或生成项目教程"""
-    existing_tutorial = master.db.get_tutorial(project_id)
-    
+    existing_tutorial = await asyncio.to_thread(master.db.get_tutorial, project_id)
+
     if existing_tutorial:
-        return jsonify({"tutorial": existing_tutorial})
-    
+        return {"tutorial": existing_tutorial}
+
     # 生成新教程
-    tutorial = master.generate_tutorial(project_id)
-    return jsonify({"tutorial": tutorial})
+    tutorial = await asyncio.to_thread(master.generate_tutorial, project_id)
+    return {"tutorial": tutorial}
+
+
+@app.get('/api/tutorial/{project_id}/stream')
+async def stream_tutorial(project_id: str):
+    """流式获取或生成项目教程 (SSE)"""
+    # 同步生成器由 StreamingResponse 在线程池中迭代
+    def generate():
+        for chunk in master.generate_tutorial_stream(project_id):
+            yield _sse({'delta': chunk})
+        yield _sse({'done': True})
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers=SSE_HEADERS)
 
 
-@app.route('/api/status')
-def get_status():
+@app.get('/api/status')
+@cached(lambda: "status")
+async def get_status():
     """获取系统状态"""
-    return jsonify(master.get_status())
+    return await asyncio.to_thread(master.get_status)
 
 
-@app.route('/api/stats')
-def get_stats():
+@app.get('/api/stats')
+@cached(lambda: "stats")
+async def get_stats():
     """获取统计信息"""
-    return jsonify(master.db.get_stats())
+    return await asyncio.to_thread(master.db.get_stats)
 
-@app.route('/api/pending')
-def get_pending():
+@app.get('/api/dashboard')
+@cached(lambda: "dashboard")
+async def get_dashboard():
+    """侧边栏所需的统计、待分析数、最近扫描和分类计数 (一次查询)"""
+    return await asyncio.to_thread(master.db.get_dashboard_snapshot)
+
+@app.get('/api/pending')
+@cached(lambda: "pending")
+async def get_pending():
     """获取待分析项目数量"""
-    count = master.db.get_pending_count()
-    return jsonify({"pending": count})
+    count = await asyncio.to_thread(master.db.get_pending_count)
+    return {"pending": count}
 
-@app.route('/api/progress')
-def get_progress():
+@app.get('/api/progress')
+async def get_progress():
     """获取当前分析进度"""
-    return jsonify(master.progress if hasattr(master, 'progress') else {"total": 0, "done": 0, "current": "Idle"})
+    return master.progress if hasattr(master, 'progress') else {"total": 0, "done": 0, "current": "Idle"}
 
 
-@app.route('/api/logs')
-def stream_logs():
+@app.get('/api/logs')
+async def stream_logs():
     """SSE 日志流"""
-    def generate():
-        while True:
-            try:
-                data = log_queue.get(timeout=30)
-                yield f"data: {json.dumps(data)}\n\n"
-            except:
-                yield f"data: {json.dumps({'message': 'ping', 'level': 'ping'})}\n\n"
-    
-    return Response(generate(), mimetype='text/event-stream')
+    # 每个连接独立订阅，多个标签页都能收到完整日志
+    subscriber = master.subscribe()
+
+    async def generate():
+        try:
+            while True:
+                try:
+                    # 订阅队列创建在后台事件循环上，在那边等待；断开连接时等待会被一并取消
+                    data = await run_on_loop(asyncio.wait_for(subscriber.get(), LOG_PING_INTERVAL))
+                except asyncio.TimeoutError:
+                    data = {'message': 'ping', 'level': 'ping'}
+                yield _sse(data)
+        finally:
+            master.unsubscribe(subscriber)
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers=SSE_HEADERS)
 
 
 if __name__ == '__main__':
+    import uvicorn
+
     print("\n" + "="*60)
     print("=== GitHub Hub - Open Source Project Dashboard ===")
     print("="*60)
     print("Open: http://localhost:5001")
     print("API:  http://localhost:5001/api/status")
     print("="*60 + "\n")
-    
-    # 启动定时任务线程
-    from master import run_scheduled_scan
-    scheduler_thread = threading.Thread(target=run_scheduled_scan, args=(master,))
-    scheduler_thread.daemon = True
-    scheduler_thread.start()
-    
-    app.run(host='0.0.0.0', port=5001, debug=True, threaded=True)
+
+    # 启动定时扫描 (运行在后台事件循环上，不单独占用线程)
+    if RUN_SCHEDULER:
+        from .master import start_scheduled_scan
+        start_scheduled_scan(master)
+
+    # 单进程运行。多 worker 部署见 scheduler.py：
+    #   RUN_SCHEDULER=0 uvicorn github_hub.server:app --workers 4
+    # 不要用 gunicorn --preload：MasterAgent 的后台线程 (事件循环、写库线程) 不会跟随 fork 进入 worker
+    uvicorn.run(app, host='0.0.0.0', port=5001)
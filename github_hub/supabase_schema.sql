@@ -72,3 +72,150 @@ CREATE POLICY "Allow all access to projects" ON projects FOR ALL USING (true) WI
 CREATE POLICY "Allow all access to scan_history" ON scan_history FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all access to settings" ON settings FOR ALL USING (true) WITH CHECK (true);
 CREATE POLICY "Allow all access to news_sources" ON news_sources FOR ALL USING (true) WITH CHECK (true);
+
+
+-- ============================================================
+-- Dashboard stats in one round-trip (analyzed = analyzed by the 120B model)
+-- ============================================================
+CREATE OR REPLACE FUNCTION get_project_stats()
+RETURNS TABLE(total bigint, analyzed bigint, categories bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT COUNT(*),
+           COUNT(*) FILTER (WHERE ai_model_name ILIKE '%120b%'),
+           COUNT(DISTINCT category)
+    FROM projects
+$$;
+
+-- ============================================================
+-- Trigram indexes: make the ILIKE '%term%' search fallback index-backed
+-- (the fallback handles CJK queries that the tsvector parser cannot split into words)
+-- ============================================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_projects_name_trgm ON projects USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_projects_description_trgm ON projects USING gin (description gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_projects_rag_summary_trgm ON projects USING gin (ai_rag_summary gin_trgm_ops);
+
+-- ============================================================
+-- Ranked full-text search: weighted 'simple' tsvector (name > description > RAG summary)
+-- (drops the english search_doc column from the first FTS migration)
+-- ============================================================
+ALTER TABLE projects DROP COLUMN IF EXISTS search_doc;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(ai_rag_summary, '')), 'C')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_projects_search_tsv ON projects USING gin (search_tsv);
+
+CREATE OR REPLACE FUNCTION search_projects_fts(q text, lim int DEFAULT 50)
+RETURNS SETOF projects
+LANGUAGE sql STABLE AS $$
+    SELECT p.*
+    FROM projects p, plainto_tsquery('simple', q) query
+    WHERE p.search_tsv @@ query
+    ORDER BY ts_rank_cd(p.search_tsv, query) DESC, p.stars DESC
+    LIMIT lim
+$$;
+
+-- ============================================================
+-- Per-category project counts, aggregated server-side
+-- ============================================================
+CREATE OR REPLACE VIEW projects_category_counts AS
+    SELECT category, count(*) AS n
+    FROM projects
+    GROUP BY category;
+
+-- ============================================================
+-- Projects still lacking a 120B analysis (get_pending_count)
+-- ============================================================
+CREATE INDEX IF NOT EXISTS idx_projects_pending ON projects (id)
+    WHERE ai_model_name IS NULL OR ai_model_name NOT ILIKE '%120b%';
+
+-- ============================================================
+-- Computed column for list views: select=...,has_tutorial
+-- (avoids shipping the ai_tutorial markdown just to show a badge)
+-- ============================================================
+CREATE OR REPLACE FUNCTION has_tutorial(projects)
+RETURNS boolean
+LANGUAGE sql STABLE AS $$
+    SELECT $1.ai_tutorial IS NOT NULL AND $1.ai_tutorial <> ''
+$$;
+
+-- ============================================================
+-- Single search entry point: ranked FTS, then escaped substring match
+-- when FTS finds nothing (unspaced CJK text). Plain text arguments
+-- let the planner cache the plan across calls.
+-- ============================================================
+CREATE OR REPLACE FUNCTION search_projects(q text, lim int DEFAULT 50)
+RETURNS SETOF projects
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    pattern text := '%' || replace(replace(replace(q, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    RETURN QUERY SELECT * FROM search_projects_fts(q, lim);
+    IF NOT FOUND THEN
+        RETURN QUERY
+            SELECT p.* FROM projects p
+            WHERE p.name ILIKE pattern OR p.description ILIKE pattern OR p.ai_rag_summary ILIKE pattern
+            ORDER BY p.stars DESC
+            LIMIT lim;
+    END IF;
+END
+$$;
+
+-- ============================================================
+-- Indexes for the hot list queries
+-- ============================================================
+-- get_projects_by_category: WHERE category = ? ORDER BY stars DESC LIMIT n
+-- (supersedes the single-column idx_projects_category)
+CREATE INDEX IF NOT EXISTS idx_projects_category_stars ON projects (category, stars DESC);
+DROP INDEX IF EXISTS idx_projects_category;
+-- Projects with no analysis at all
+CREATE INDEX IF NOT EXISTS idx_projects_unanalyzed ON projects (id) WHERE ai_summary IS NULL;
+-- get_recent_scans: ORDER BY scan_time DESC LIMIT 20
+CREATE INDEX IF NOT EXISTS idx_scan_history_time ON scan_history (scan_time DESC);
+CREATE INDEX IF NOT EXISTS idx_news_sources_last_scanned ON news_sources (last_scanned);
+
+-- ============================================================
+-- Everything the dashboard sidebar polls, in one round trip
+-- ============================================================
+CREATE OR REPLACE FUNCTION dashboard_snapshot()
+RETURNS json
+LANGUAGE sql STABLE AS $$
+    SELECT json_build_object(
+        'stats', (
+            SELECT json_build_object(
+                'total_projects', COUNT(*),
+                'analyzed_projects', COUNT(*) FILTER (WHERE ai_model_name ILIKE '%120b%'),
+                'categories', COUNT(DISTINCT category),
+                'total_stars', COALESCE(SUM(stars), 0)
+            )
+            FROM projects
+        ),
+        'pending', (
+            SELECT COUNT(*) FROM projects
+            WHERE ai_model_name IS NULL OR ai_model_name NOT ILIKE '%120b%'
+        ),
+        'recent_scans', (
+            SELECT COALESCE(json_agg(s), '[]'::json)
+            FROM (SELECT * FROM scan_history ORDER BY scan_time DESC LIMIT 20) s
+        ),
+        'categories', (
+            SELECT COALESCE(json_object_agg(category, n), '{}'::json)
+            FROM projects_category_counts
+        )
+    )
+$$;
+
+-- ============================================================
+-- Analysis queue (get_projects_needing_analysis): rows with no analysis
+-- or one not produced by the 120B model, unanalyzed first, then by stars
+-- ============================================================
+CREATE INDEX IF NOT EXISTS idx_projects_needing_analysis ON projects (stars DESC)
+    WHERE ai_summary IS NULL OR ai_model_name IS NULL OR ai_model_name NOT ILIKE '%120b%';
+
+CREATE OR REPLACE VIEW projects_needing_analysis AS
+    SELECT p.*, (p.ai_summary IS NULL) AS unanalyzed
+    FROM projects p
+    WHERE p.ai_summary IS NULL OR p.ai_model_name IS NULL OR p.ai_model_name NOT ILIKE '%120b%';
@@ -12,7 +12,7 @@ try:
     client = create_client(SUPABASE_URL, SUPABASE_KEY)
     
     # Check projects count
-    response = client.table("projects").select("id", count="exact").execute()
+    response = client.table("projects").select("id", count="exact", head=True).execute()
     print(f"Projects count: {response.count}")
     
     # Get first 3 projects
@@ -12,38 +12,41 @@ print(f"sys.path: {sys.path[:5]}")
 print(f"SUPABASE_URL set: {bool(os.environ.get('SUPABASE_URL'))}")
 print(f"SUPABASE_KEY set: {bool(os.environ.get('SUPABASE_KEY'))}")
 
-try:
-    from github_hub.server import app
-    print("Server imported successfully!")
-except Exception as e:
-    # Fallback for debugging import errors on Vercel
-    from flask import Flask, jsonify
-    import traceback
+# 截图子进程 (forkserver / spawn) 以 __mp_main__ 重新执行本文件时不导入服务，避免再创建一个 MasterAgent
+if __name__ != "__mp_main__":
+    try:
+        from github_hub.server import app
+        print("Server imported successfully!")
+    except Exception as e:
+        # Fallback for debugging import errors on Vercel
+        from fastapi import FastAPI
+        from fastapi.responses import HTMLResponse
+        import traceback
     
-    error_details = traceback.format_exc()
-    print(f"IMPORT ERROR: {e}")
-    print(error_details)
+        error_details = traceback.format_exc()
+        print(f"IMPORT ERROR: {e}")
+        print(error_details)
     
-    app = Flask(__name__)
+        app = FastAPI()
     
-    @app.route('/', defaults={'path': ''})
-    @app.route('/<path:path>')
-    def catch_all(path):
-        return f'''
-        <html>
-        <head><title>Debug Error</title></head>
-        <body style="background:#111;color:#0f0;font-family:monospace;padding:20px;">
-        <h1 style="color:#f00;">Import Error</h1>
-        <pre style="background:#222;padding:20px;overflow:auto;">{error_details}</pre>
-        <h2>Environment</h2>
-        <pre>
+        @app.api_route('/{path:path}', methods=['GET', 'POST', 'DELETE'])
+        async def catch_all(path: str):
+            return HTMLResponse(f'''
+            <html>
+            <head><title>Debug Error</title></head>
+            <body style="background:#111;color:#0f0;font-family:monospace;padding:20px;">
+            <h1 style="color:#f00;">Import Error</h1>
+            <pre style="background:#222;padding:20px;overflow:auto;">{error_details}</pre>
+            <h2>Environment</h2>
+            <pre>
 SUPABASE_URL: {bool(os.environ.get('SUPABASE_URL'))}
 SUPABASE_KEY: {bool(os.environ.get('SUPABASE_KEY'))}
 CWD: {os.getcwd()}
-        </pre>
-        </body>
-        </html>
-        ''', 500
+            </pre>
+            </body>
+            </html>
+            ''', status_code=500)
 
 if __name__ == "__main__":
-    app.run()
+    import uvicorn
+    uvicorn.run(app)
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from github_hub.aio import get_loop, in_loop_thread, run_sync
+
+
+async def _answer():
+    return 42
+
+
+def test_run_sync_returns_result():
+    assert run_sync(_answer()) == 42
+
+
+def test_run_sync_refuses_loop_thread():
+    async def _nested():
+        assert in_loop_thread()
+        coro = _answer()
+        with pytest.raises(RuntimeError):
+            run_sync(coro)
+        # run_sync closes the coroutine it refused, so it never warns "was never awaited"
+        assert coro.cr_frame is None
+        return True
+
+    future = asyncio.run_coroutine_threadsafe(_nested(), get_loop())
+    assert future.result(timeout=5)
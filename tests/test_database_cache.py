@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("supabase")
+
+from github_hub import database  # noqa: E402
+
+STATS = {"total_projects": 3, "analyzed_projects": 1, "categories": 2}
+SNAPSHOT = {"stats": STATS, "pending": 2, "recent_scans": [], "categories": {"ai": 3}}
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Rpc:
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self):
+        if isinstance(self.data, Exception):
+            raise self.data
+        return _Response(self.data)
+
+
+class _Client:
+    def __init__(self, snapshot=SNAPSHOT):
+        self.results = {
+            "get_project_stats": [{"total": 3, "analyzed": 1, "categories": 2}],
+            "dashboard_snapshot": snapshot,
+        }
+
+    def rpc(self, name):
+        return _Rpc(self.results[name])
+
+
+@pytest.fixture
+def db():
+    db = database.Database()
+    db.supabase = _Client()
+    yield db
+    db.close()
+
+
+def test_snapshot_and_stats_are_cached_separately(db):
+    assert db.get_dashboard_snapshot() == SNAPSHOT
+    assert db.get_stats() == STATS
+    # Cached reads still return their own payloads
+    assert db.get_dashboard_snapshot() == SNAPSHOT
+    assert db.get_stats() == STATS
+
+
+def test_snapshot_fallback_does_not_overwrite_stats(db, monkeypatch):
+    db.supabase = _Client(snapshot=RuntimeError("function dashboard_snapshot() does not exist"))
+    monkeypatch.setattr(db, "get_pending_count", lambda: 2)
+    monkeypatch.setattr(db, "get_recent_scans", lambda: [])
+    monkeypatch.setattr(db, "get_all_categories_summary", lambda: {"ai": 3})
+
+    assert db.get_dashboard_snapshot() == SNAPSHOT
+    assert db.get_stats() == STATS
+    assert db.get_dashboard_snapshot() == SNAPSHOT
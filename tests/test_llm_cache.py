@@ -0,0 +1,32 @@
+import pytest
+
+from github_hub.llm_cache import LLMCache
+
+
+def test_memory_lru_evicts_least_recently_used(tmp_path):
+    cache = LLMCache(directory=str(tmp_path), maxsize=2)
+    cache._disk = None  # memory tier only
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_disk_fallback_after_memory_eviction(tmp_path):
+    pytest.importorskip("diskcache")
+    cache = LLMCache(directory=str(tmp_path), maxsize=1)
+    cache.set("a", {"summary": "x"})
+    cache.set("b", {"summary": "y"})
+    assert "a" not in cache._memory
+    assert cache.get("a") == {"summary": "x"}
+    # A disk hit is promoted back into memory
+    assert "a" in cache._memory
+
+
+def test_disk_survives_new_instance(tmp_path):
+    pytest.importorskip("diskcache")
+    LLMCache(directory=str(tmp_path)).set("k", "v")
+    assert LLMCache(directory=str(tmp_path)).get("k") == "v"
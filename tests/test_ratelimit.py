@@ -0,0 +1,33 @@
+import time
+
+from github_hub.ratelimit import DomainRateLimiter, TokenBucket
+
+
+def test_token_bucket_spends_burst_without_waiting():
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    assert [bucket._reserve(1) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # The fourth token is an overdraft: roughly one second at 1 token/s
+    assert 0.9 < bucket._reserve(1) <= 1.0
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=100.0, capacity=2)
+    bucket._reserve(2)
+    time.sleep(0.05)  # ~5 tokens' worth, capped at capacity
+    assert bucket._reserve(2) == 0.0
+    assert bucket._reserve(1) > 0
+
+
+def test_token_bucket_acquire_sleeps_for_overdraft():
+    bucket = TokenBucket(rate=20.0, capacity=1)
+    bucket.acquire()
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_domain_limiter_spaces_same_host_only():
+    limiter = DomainRateLimiter(delay=1.0)
+    assert limiter._reserve("a.example") == 0.0
+    assert limiter._reserve("b.example") == 0.0
+    assert 0.9 < limiter._reserve("a.example") <= 1.0
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("supabase")
+
+from github_hub.aio import get_loop  # noqa: E402
+from github_hub.master import MasterAgent  # noqa: E402
+
+
+@pytest.fixture
+def master():
+    # Only the pub-sub state is needed; skip the database / crawler setup in __init__
+    master = MasterAgent.__new__(MasterAgent)
+    master.subscribers = []
+    return master
+
+
+def test_queue_subscribed_off_loop_is_consumed_on_loop(master):
+    queue = master.subscribe()
+    master._notify("hello")
+
+    async def _get():
+        return await asyncio.wait_for(queue.get(), 5)
+
+    message = asyncio.run_coroutine_threadsafe(_get(), get_loop()).result(timeout=5)
+    assert message["message"] == "hello"
+    master.unsubscribe(queue)
+    assert master.subscribers == []
+
+
+def test_full_queue_drops_oldest(master):
+    queue = master.subscribe(maxsize=2)
+    for text in ("a", "b", "c"):
+        master._notify(text)
+
+    async def _drain():
+        return [queue.get_nowait()["message"] for _ in range(queue.qsize())]
+
+    # _notify hands off to the loop; this coroutine runs after the three publishes
+    assert asyncio.run_coroutine_threadsafe(_drain(), get_loop()).result(timeout=5) == ["b", "c"]
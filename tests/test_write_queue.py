@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("supabase")
+
+from github_hub import database  # noqa: E402
+
+
+class _Table:
+    def __init__(self, client):
+        self.client = client
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def eq(self, column, value):
+        self.project_id = value
+        return self
+
+    def execute(self):
+        self.client.calls.append((self.project_id, self.fields))
+        if self.project_id in self.client.failing:
+            raise RuntimeError("write refused")
+
+
+class _Client:
+    """Records the UPDATE calls the write queue makes"""
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    def table(self, name):
+        assert name == "projects"
+        return _Table(self)
+
+
+@pytest.fixture
+def db():
+    db = database.Database()
+    db.supabase = _Client()
+    yield db
+    db.close()
+
+
+def test_updates_to_one_project_are_coalesced(db):
+    db.update_project_tutorial("p1", "tutorial")
+    db.update_project_screenshot("p1", "shot.png")
+    db.update_project_tutorial("p2", "other")
+    db.update_project_tutorial("p1", "newer tutorial")
+
+    assert db.flush() == []
+    assert sorted(db.supabase.calls) == [
+        ("p1", {"ai_tutorial": "newer tutorial", "screenshot": "shot.png"}),
+        ("p2", {"ai_tutorial": "other"}),
+    ]
+
+
+def test_flush_waits_for_queued_writes(db):
+    for i in range(database.WRITE_BATCH_SIZE + 5):
+        db.update_project_screenshot(f"p{i}", "shot.png")
+    db.flush()
+    assert len(db.supabase.calls) == database.WRITE_BATCH_SIZE + 5
+
+
+def test_failed_writes_are_retried_then_reported(db, monkeypatch):
+    monkeypatch.setattr(database, "WRITE_RETRY_DELAY", 0)
+    db.supabase = _Client(failing={"bad"})
+    db.update_project_screenshot("bad", "shot.png")
+    db.update_project_screenshot("good", "shot.png")
+
+    assert db.flush() == ["bad"]
+    assert db.write_failures == 1
+    assert [pid for pid, _ in db.supabase.calls].count("bad") == database.WRITE_MAX_RETRIES + 1
+    assert [pid for pid, _ in db.supabase.calls].count("good") == 1
+    # The failure is reported once
+    assert db.flush() == []